@@ -0,0 +1,101 @@
+"""Measure the speed of a camera-in-the-loop optimisation on a simulated bench.
+
+A SimulatedCamera looks at the far field of an aberrated slm, and stochastic
+parallel gradient descent (SPGD) adjusts a grid of phase blocks, sent with
+set_image_scaled, to focus the light into the centre of the camera. Each
+iteration shows two perturbed patterns and takes an image of each.
+
+The loop is run with the camera looking at an offscreen display behind the
+grpc server ("remote"), at the in-process offscreen display ("local"), and
+straight at the frames ("camera only", no display), and the iterations per
+second and the fraction of light focused are reported. The remote server is
+started first, as its process can't be forked once Qt is running here.
+
+    QT_QPA_PLATFORM=offscreen python benchmarks/closed_loop.py --iterations 200
+"""
+import argparse
+import time
+
+import numpy as np
+
+from slmmm import LocalSLMController, SLMController
+from slmmm.expand import expand_blocks
+from slmmm.loadtest import wait_for_server
+from slmmm.simulation import SimulatedCamera
+
+ABERRATIONS = {"defocus": 4.0, "astigmatism": 3.0, "coma_x": 2.0}
+
+
+class FrameSource:
+    """Expands frames the way the server does, for the camera to look at
+    without a display in between
+    """
+
+    def __init__(self, shape):
+        self.frame = np.zeros(shape, dtype=np.uint8)
+
+    def set_image_scaled(self, image, scale):
+        expand_blocks(image, scale, self.frame)
+
+    def displayed_frame(self):
+        return self.frame
+
+
+def focus(image, radius=1):
+    """The fraction of the light in the centre of a camera image
+    """
+    rows, columns = image.shape[0] // 2, image.shape[1] // 2
+    centre = image[rows - radius:rows + radius + 1, columns - radius:columns + radius + 1]
+    return float(centre.sum())
+
+
+def run(name, slm, shape, args):
+    camera = SimulatedCamera(slm.displayed_frame, aberrations=ABERRATIONS, noise=args.noise,
+                             exposure=args.exposure, latency=args.latency, seed=0)
+    rng = np.random.default_rng(0)
+    scale = min(shape) // args.blocks
+    phases = np.zeros((args.blocks, args.blocks))
+
+    def measure(pattern):
+        slm.set_image_scaled(np.mod(np.round(pattern), 256).astype(np.uint8), scale)
+        return focus(camera.capture())
+
+    start_focus = measure(phases)
+    start = time.perf_counter()
+    for _ in range(args.iterations):
+        delta = args.perturbation * rng.choice([-1, 1], phases.shape)
+        plus, minus = measure(phases + delta), measure(phases - delta)
+        phases += args.gain * (plus - minus) / max(plus + minus, 1e-12) * delta
+    total = time.perf_counter() - start
+    end_focus = measure(phases)
+    print(f"{name:>12}: {args.iterations / total:8.1f} iterations/s  "
+          f"focus {start_focus:.3f} -> {end_focus:.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--blocks", type=int, default=8,
+                        help="the number of phase blocks along each side")
+    parser.add_argument("--perturbation", type=float, default=16,
+                        help="the size of the perturbations, in grey levels")
+    parser.add_argument("--gain", type=float, default=8)
+    parser.add_argument("--noise", type=float, default=1e-4)
+    parser.add_argument("--exposure", type=float, default=0.0, help="seconds")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds")
+    parser.add_argument("--port", type=int, default=50660)
+    args = parser.parse_args()
+
+    remote = SLMController(args.port, use_cache=False)
+    remote.start_server()
+    wait_for_server(args.port)
+    shape = remote.displayed_frame().shape
+    run("remote", remote, shape, args)
+    remote.stop_server()
+
+    local = LocalSLMController()
+    local.start_server()
+    run("local", local, shape, args)
+    local.stop_server()
+
+    run("camera only", FrameSource(shape), shape, args)
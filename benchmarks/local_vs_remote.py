@@ -0,0 +1,55 @@
+"""Compare the latency of putting frames on the slm through the grpc server
+and through the in-process display.
+
+A remote call returns once the server has taken the frame. A local call
+returns straight away, and a frame replaced before the display gets to it is
+never painted, so the local display is also timed waiting for each frame to
+be shown ("local sync").
+
+    QT_QPA_PLATFORM=offscreen python benchmarks/local_vs_remote.py --size 1024 --frames 200
+"""
+import argparse
+import time
+
+import numpy as np
+
+from slmmm import LocalSLMController, SLMController
+from slmmm.loadtest import wait_for_server
+
+
+def run(name, controller, frames, sync=False):
+    latencies = []
+    start = time.perf_counter()
+    for frame in frames:
+        sent = time.perf_counter()
+        controller.set_image(frame)
+        if sync:
+            controller.flush()
+        latencies.append(time.perf_counter() - sent)
+    controller.flush()
+    total = time.perf_counter() - start
+    p50, p99 = np.percentile(np.asarray(latencies) * 1e3, [50, 99])
+    print(f"{name:>10}: {len(frames) / total:8.1f} frames/s  "
+          f"call p50 {p50:7.3f} ms  p99 {p99:7.3f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=1024)
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--port", type=int, default=50650)
+    args = parser.parse_args()
+    frames = [np.random.randint(0, 256, (args.size, args.size), dtype=np.uint8)
+              for _ in range(args.frames)]
+
+    remote = SLMController(args.port, use_cache=False)
+    remote.start_server()
+    wait_for_server(args.port)
+    run("remote", remote, frames)
+    remote.stop_server()
+
+    local = LocalSLMController()
+    local.start_server()
+    run("local", local, frames)
+    run("local sync", local, frames, sync=True)
+    local.stop_server()
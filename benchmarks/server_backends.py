@@ -0,0 +1,83 @@
+"""Compare the thread pool and asyncio grpc servers under many concurrent clients.
+
+The servers run in this process with a worker that drops every frame, so the
+numbers measure the grpc and request handling cost rather than Qt painting.
+Each client is a separate process sending an even mix of SetImage and a
+streamed SetImageColour, see slmmm.loadtest for load testing a real display.
+
+    python benchmarks/server_backends.py --clients 32 --size 512 --duration 5
+"""
+import argparse
+import asyncio
+import threading
+from concurrent import futures
+
+import grpc
+
+from slmmm import slm_pb2_grpc
+from slmmm.frames import MESSAGE_OPTIONS
+from slmmm.loadtest import format_summary, run_clients
+from slmmm.slm_server import SLM, AsyncSLM
+
+
+class NullSignal:
+    def emit(self, *args):
+        pass
+
+
+class NullWorker:
+    def __getattr__(self, name):
+        return NullSignal()
+
+
+def start_threaded(port):
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10), options=MESSAGE_OPTIONS)
+    slm_pb2_grpc.add_SLMServicer_to_server(SLM(NullWorker()), server)
+    server.add_insecure_port(f"localhost:{port}")
+    server.start()
+    return lambda: server.stop(None)
+
+
+def start_asyncio(port):
+    loop = asyncio.new_event_loop()
+    started = threading.Event()
+
+    async def run():
+        server = grpc.aio.server(maximum_concurrent_rpcs=100, options=MESSAGE_OPTIONS)
+        slm_pb2_grpc.add_SLMServicer_to_server(AsyncSLM(NullWorker()), server)
+        server.add_insecure_port(f"localhost:{port}")
+        await server.start()
+        run.server = server
+        started.set()
+        await server.wait_for_termination()
+
+    thread = threading.Thread(target=loop.run_until_complete, args=(run(),), daemon=True)
+    thread.start()
+    started.wait()
+
+    def stop():
+        asyncio.run_coroutine_threadsafe(run.server.stop(None), loop).result()
+        thread.join()
+    return stop
+
+
+def run(name, start_server, port, clients, size, duration):
+    stop = start_server(port)
+    try:
+        summary = run_clients(port, clients, [size], 0,
+                              {"SetImage": 1, "SetImageColour": 1}, duration)
+    finally:
+        stop()
+    print(name)
+    print(format_summary(summary))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--size", type=int, default=512)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--port", type=int, default=50600)
+    args = parser.parse_args()
+    run("threaded", start_threaded, args.port, args.clients, args.size, args.duration)
+    run("asyncio", start_asyncio, args.port + 1, args.clients, args.size, args.duration)
@@ -11,7 +11,8 @@ with open('HISTORY.rst') as history_file:
     history = history_file.read()
 
 requirements = ["numpy>=1.19", "PyQt5>=5.14",
-                "grpcio>=1.35", "grpcio-tools>=1.35"]
+                "grpcio>=1.35", "grpcio-tools>=1.35",
+                "protobuf>=3.20"]
 
 setup_requirements = ['pytest-runner', ]
 
@@ -6,3 +6,4 @@ __version__ = '0.1.0'
 
 from .slm_server import SLMDisplay
 from .slm_controller import SLMController
+from .local_controller import LocalSLMController, open_controller
@@ -0,0 +1,142 @@
+"""Calibration sweeps: stepping the slm through a sequence of grey levels, such
+as for measuring its phase response (LUT calibration), with each frame shown
+for a fixed number of screen refreshes.
+
+The frames are generated where they're shown, and a SweepEvent is put on the
+sweep's queue as each frame is taken off the screen, with the wall clock
+times (time.time_ns) it was put on the screen and first painted, so camera
+frames can be lined up with the levels afterwards.
+"""
+import queue
+
+import numpy as np
+
+from slmmm import slm_pb2
+
+PATTERN_NAMES = {"uniform": slm_pb2.UNIFORM, "split": slm_pb2.SPLIT_SCREEN,
+                 "phase_steps": slm_pb2.PHASE_STEPS}
+
+
+def level_region(pattern, shape, period=8):
+    """Get a bool array of the given (height, width), True where a sweep
+    pattern shows the level being tested and False where it shows the
+    reference level
+    """
+    height, width = shape
+    columns = np.arange(width)
+    if pattern == slm_pb2.UNIFORM:
+        row = np.ones(width, dtype=bool)
+    elif pattern == slm_pb2.SPLIT_SCREEN:
+        row = columns >= width // 2
+    elif pattern == slm_pb2.PHASE_STEPS:
+        row = (columns // period) % 2 == 1
+    else:
+        raise ValueError(f"Unknown sweep pattern {pattern}")
+    return np.broadcast_to(row, (height, width))
+
+
+class Sweep:
+    """A calibration sweep, and the queue of events from showing it.
+
+    pattern is one of:
+    - UNIFORM: the whole screen at each level
+    - SPLIT_SCREEN: the left half at the reference level and the right half
+      at each level
+    - PHASE_STEPS: stripes period pixels wide alternating between the
+      reference level and each level, a grating whose diffraction depends on
+      the phase step between them
+    levels are the grey levels to step through, all 256 in order if None.
+    Each frame is shown for dwell screen refreshes.
+    Iterating over a sweep yields its events as they happen, until it finishes.
+    Raises ValueError if the parameters are invalid
+    """
+
+    def __init__(self, pattern=slm_pb2.UNIFORM, levels=None, dwell=1, reference=0, period=8):
+        self.levels = np.arange(256) if levels is None else np.asarray(levels, dtype=np.int64)
+        if self.levels.ndim != 1 or len(self.levels) == 0:
+            raise ValueError("A sweep needs at least one level")
+        if self.levels.min() < 0 or self.levels.max() > 255 or not 0 <= reference <= 255:
+            raise ValueError("Sweep levels should be between 0 and 255")
+        if dwell < 1 or period < 1:
+            raise ValueError("The dwell and period of a sweep should be at least 1")
+        if pattern not in (slm_pb2.UNIFORM, slm_pb2.SPLIT_SCREEN, slm_pb2.PHASE_STEPS):
+            raise ValueError(f"Unknown sweep pattern {pattern}")
+        self.pattern = pattern
+        self.dwell = dwell
+        self.reference = reference
+        self.period = period
+        self.region = None
+        self.events = queue.Queue()
+        self.cancelled = False
+        self._showing = None
+
+    @classmethod
+    def from_request(cls, request):
+        """Make a sweep from a CalibrationSweep request, with defaults for unset fields
+        """
+        return cls(request.pattern, list(request.levels) or None, request.dwell_refreshes or 1,
+                   request.reference_level, request.period or 8)
+
+    @classmethod
+    def failed(cls, error):
+        """Make a sweep which has already finished with the given error
+        """
+        sweep = cls()
+        sweep.finish(error)
+        return sweep
+
+    def start(self, shape):
+        """Get ready to generate frames of the given (height, width)
+        """
+        self.region = level_region(self.pattern, shape, self.period)
+
+    def frame(self, index, out):
+        """Write the frame showing the level at index into out
+        """
+        if self.pattern == slm_pb2.UNIFORM:
+            out.fill(self.levels[index])
+        else:
+            out.fill(self.reference)
+            np.copyto(out, self.levels[index], where=self.region, casting="unsafe")
+        return out
+
+    def shown(self, index, shown_ns):
+        """Record that the frame at index was put on the screen at shown_ns
+        """
+        self._showing = slm_pb2.SweepEvent(index=index, level=int(self.levels[index]),
+                                           shown_ns=shown_ns)
+
+    def hidden(self, painted_ns):
+        """Record that the frame on the screen is being replaced, given when the
+        screen was first painted after it was shown (0 if it wasn't), and put
+        its event on the queue
+        """
+        if self._showing is not None:
+            if painted_ns >= self._showing.shown_ns:
+                self._showing.painted_ns = painted_ns
+            self.events.put(self._showing)
+            self._showing = None
+
+    def finish(self, error=None):
+        """End the sweep's events, with an error event first if it didn't complete
+        """
+        if error:
+            self.events.put(slm_pb2.SweepEvent(index=-1, error=error))
+        self.events.put(None)
+
+    def cancel(self):
+        """Stop the sweep at its next frame, from any thread
+        """
+        self.cancelled = True
+
+    def __iter__(self):
+        return iter(self.events.get, None)
+
+
+def check_events(events):
+    """Yield the events of a sweep, raising RuntimeError at an error event
+    """
+    for event in events:
+        if event.error:
+            raise RuntimeError(event.error)
+        yield event
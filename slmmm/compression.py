@@ -0,0 +1,107 @@
+import bz2
+import lzma
+import time
+import zlib
+
+from slmmm import slm_pb2
+
+# the compress function and decompressor class of each codec, all from the standard library
+CODECS = {
+    slm_pb2.ZLIB: (lambda data: zlib.compress(data, 1), zlib.decompressobj),
+    slm_pb2.LZMA: (lambda data: lzma.compress(data, preset=0), lzma.LZMADecompressor),
+    slm_pb2.BZ2: (lambda data: bz2.compress(data, 1), bz2.BZ2Decompressor),
+}
+
+CODEC_NAMES = {"zlib": slm_pb2.ZLIB, "lzma": slm_pb2.LZMA, "bz2": slm_pb2.BZ2}
+
+
+def decompress(data, codec, max_length):
+    """Get the raw bytes of a payload compressed with the given codec, which
+    should be at most max_length bytes. Decompression stops as soon as the
+    output passes max_length, so a small payload can't expand to fill memory.
+    Raises ValueError if the codec isn't known, the payload is corrupt or
+    truncated, or it decompresses to more than max_length bytes
+    """
+    if codec == slm_pb2.NO_COMPRESSION:
+        return data
+    if codec not in CODECS:
+        raise ValueError(f"Unknown compression codec {codec}")
+    decompressor = CODECS[codec][1]()
+    try:
+        raw = decompressor.decompress(data, max_length + 1)
+    except (zlib.error, lzma.LZMAError, OSError) as e:
+        raise ValueError(f"Couldn't decompress the image: {e}")
+    if len(raw) > max_length:
+        raise ValueError(f"The image decompresses to more than {max_length} bytes")
+    if not decompressor.eof:
+        raise ValueError("The compressed image is truncated")
+    return raw
+
+
+class CompressionPolicy:
+    """Decides, frame by frame, whether compressing a frame before sending it
+    would get it to the server sooner.
+
+    It keeps moving averages of the link's throughput (measured from every send),
+    the codec's compression speed and the compression ratio (measured from
+    compressed frames). A frame is compressed if the time to compress it plus
+    send the compressed bytes is expected to beat sending it raw. Every
+    probe_every frames the other choice is tried, so the estimates follow
+    changes in the link and the images.
+    """
+
+    def __init__(self, codec=slm_pb2.ZLIB, probe_every=32, smoothing=0.2):
+        self.codec = codec
+        self.probe_every = probe_every
+        self.smoothing = smoothing
+        self.link_rate = None
+        self.compress_rate = None
+        self.ratio = None
+        self.frames = 0
+        self.compressed_frames = 0
+        self.raw_bytes = 0
+        self.wire_bytes = 0
+        self.compress_time = 0.0
+
+    def _average(self, old, new):
+        return new if old is None else old + self.smoothing * (new - old)
+
+    def should_compress(self, nbytes):
+        if self.compress_rate is None or self.link_rate is None:
+            # nothing measured yet, try compressing to find out
+            return self.compress_rate is None
+        raw_time = nbytes / self.link_rate
+        compressed_time = nbytes / self.compress_rate + self.ratio * nbytes / self.link_rate
+        choice = compressed_time < raw_time
+        if self.probe_every and self.frames % self.probe_every == self.probe_every - 1:
+            return not choice
+        return choice
+
+    def encode(self, data):
+        """Get the payload to send for the raw bytes data, as (payload, codec)
+        """
+        self.frames += 1
+        self.raw_bytes += len(data)
+        if not self.should_compress(len(data)):
+            self.wire_bytes += len(data)
+            return data, slm_pb2.NO_COMPRESSION
+        start = time.perf_counter()
+        payload = CODECS[self.codec][0](data)
+        elapsed = max(time.perf_counter() - start, 1e-9)
+        self.compressed_frames += 1
+        self.compress_time += elapsed
+        self.wire_bytes += len(payload)
+        self.compress_rate = self._average(self.compress_rate, len(data) / elapsed)
+        self.ratio = self._average(self.ratio, len(payload) / max(len(data), 1))
+        return payload, self.codec
+
+    def record_send(self, nbytes, seconds):
+        """Record that nbytes took the given time to send
+        """
+        self.link_rate = self._average(self.link_rate, nbytes / max(seconds, 1e-9))
+
+    def stats(self):
+        return {"frames": self.frames, "compressed_frames": self.compressed_frames,
+                "raw_bytes": self.raw_bytes, "wire_bytes": self.wire_bytes,
+                "compression_ratio": self.ratio, "compress_time": self.compress_time,
+                "link_rate": self.link_rate, "compress_rate": self.compress_rate}
@@ -0,0 +1,59 @@
+"""Temporal dithering: showing an image with finer than 8 bit grey levels as a
+short cycle of uint8 sub-frames, one per screen refresh, whose average over the
+cycle is the finer grey level.
+"""
+import numpy as np
+
+from slmmm.expand import tile
+
+DEFAULT_SUBFRAMES = 8
+MAX_SUBFRAMES = 64
+
+# a 4x4 ordered dither matrix, as the errors pixels start the cycle with
+START_ERRORS = (np.array([[0, 8, 2, 10],
+                          [12, 4, 14, 6],
+                          [3, 11, 1, 9],
+                          [15, 7, 13, 5]], dtype=np.float32) + 0.5) / 16 - 0.5
+
+
+def grey_levels(image):
+    """Get a uint8, uint16 or floating point image as float32 grey levels, on
+    the uint8 scale: uint16 images are divided by 256, and floating point
+    images are taken to already be grey levels
+    """
+    if image.dtype == np.uint16:
+        return image.astype(np.float32) / 256
+    return image.astype(np.float32, copy=False)
+
+
+def dither(image, subframes=DEFAULT_SUBFRAMES, out=None):
+    """Get the (subframes, height, width) uint8 sub-frames which show a 2d image
+    with finer grey levels than uint8 (see grey_levels) when cycled through.
+    Grey levels wrap around at 256, like phase.
+
+    Each pixel's fractional level is diffused through time: every sub-frame a
+    pixel carries its fraction into an error, and steps up one level when the
+    error reaches a half, taking one off the error. So a pixel is up in
+    round(subframes * fraction) of the sub-frames, and the average is within
+    1/subframes of its level. Each step is vectorised over the whole image.
+    Pixels start with different errors, from an ordered dither matrix, so
+    neighbouring pixels with the same level don't all step up together.
+    Raises ValueError if subframes isn't between 1 and MAX_SUBFRAMES
+    """
+    if not 1 <= subframes <= MAX_SUBFRAMES:
+        raise ValueError(f"The number of sub-frames should be between 1 and {MAX_SUBFRAMES}")
+    levels = grey_levels(image)
+    whole = np.floor(levels)
+    fraction = levels - whole
+    whole = (whole.astype(np.int64) & 255).astype(np.uint8)
+    if out is None:
+        out = np.empty((subframes,) + levels.shape, dtype=np.uint8)
+    error = tile(START_ERRORS, np.empty(levels.shape, dtype=np.float32))
+    step = np.empty(levels.shape, dtype=bool)
+    for frame in out:
+        error += fraction
+        np.greater_equal(error, 0.5, out=step)
+        error -= step
+        # 255 stepping up wraps around to 0
+        np.add(whole, step, out=frame)
+    return out
@@ -0,0 +1,73 @@
+from numpy.lib.stride_tricks import as_strided
+
+
+def blocks(a, block_height, block_width):
+    """Get a writeable view of the 2d array a as a grid of blocks, with axes
+    [block row, row in block, block column, column in block].
+    Only whole blocks are included
+    """
+    rows, columns = a.shape[0] // block_height, a.shape[1] // block_width
+    s0, s1 = a.strides
+    return as_strided(a, (rows, block_height, columns, block_width),
+                      (block_height * s0, s0, block_width * s1, s1))
+
+
+def check_expandable(image, scale=1):
+    """Check a 2d image can be expanded into blocks of the given scale, or tiled
+    Raises ValueError if the image is empty or the scale is less than one
+    """
+    if image.ndim != 2 or image.size == 0:
+        raise ValueError("Only non-empty 2d images can be scaled or tiled")
+    if scale < 1:
+        raise ValueError("The block scale should be at least 1")
+
+
+def expand_blocks(image, scale, out):
+    """Write image into out, with each pixel repeated into a scale x scale block
+    The expanded image is put in the top left of out, and cropped if it doesn't fit.
+    The rest of out is set to zero. Raises ValueError if the image is empty or
+    the scale is less than one
+    """
+    check_expandable(image, scale)
+    height = min(out.shape[0], image.shape[0] * scale)
+    width = min(out.shape[1], image.shape[1] * scale)
+    rows, columns = height // scale, width // scale
+    row_rest, column_rest = height - rows * scale, width - columns * scale
+    out[height:] = 0
+    out[:height, width:] = 0
+
+    blocks(out[:rows * scale, :columns * scale], scale, scale)[...] = \
+        image[:rows, None, :columns, None]
+    # blocks cut off at the bottom and right edges of out
+    if row_rest:
+        blocks(out[rows * scale:height, :columns * scale], row_rest, scale)[...] = \
+            image[rows:rows + 1, None, :columns, None]
+    if column_rest:
+        blocks(out[:rows * scale, columns * scale:width], scale, column_rest)[...] = \
+            image[:rows, None, columns:columns + 1, None]
+    if row_rest and column_rest:
+        out[rows * scale:height, columns * scale:width] = image[rows, columns]
+    return out
+
+
+def tile(period, out):
+    """Fill out by repeating the 2d array period across it, starting from the top left
+    Raises ValueError if the period is empty
+    """
+    check_expandable(period)
+    height, width = period.shape
+    rows, columns = out.shape[0] // height, out.shape[1] // width
+    row_rest, column_rest = out.shape[0] - rows * height, out.shape[1] - columns * width
+
+    blocks(out[:rows * height, :columns * width], height, width)[...] = \
+        period[None, :, None, :]
+    # partial periods at the bottom and right edges of out
+    if row_rest:
+        blocks(out[rows * height:, :columns * width], row_rest, width)[...] = \
+            period[None, :row_rest, None, :]
+    if column_rest:
+        blocks(out[:rows * height, columns * width:], height, column_rest)[...] = \
+            period[None, :, None, :column_rest]
+    if row_rest and column_rest:
+        out[rows * height:, columns * width:] = period[:row_rest, :column_rest]
+    return out
@@ -0,0 +1,110 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from slmmm.frames import serialise
+
+
+def frame_digest(image: np.ndarray, variant: str = "") -> bytes:
+    """Get a content hash of an image, including its shape and dtype, so that
+    arrays with the same bytes but a different shape don't collide.
+    variant is hashed in too, for images the server turns into different
+    frames depending on how they're sent, such as dithered ones
+    """
+    data, strides = serialise(image)
+    return serialised_digest(data, strides, image.shape, image.dtype, variant)
+
+
+def serialised_digest(data: bytes, strides, shape, dtype, variant: str = "") -> bytes:
+    """Get the content hash of an image from the bytes it's sent as and their
+    layout (see frames.serialise), so the image isn't copied to be hashed.
+    The same image sent in a different layout has a different digest
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{np.dtype(dtype).str}{tuple(shape)}{tuple(strides)}{variant}".encode())
+    h.update(data)
+    return h.digest()
+
+
+class CacheStats:
+    """Hit and byte counters for a frame cache
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+
+    def record_hit(self, nbytes):
+        self.hits += 1
+        self.bytes_saved += nbytes
+
+    def record_miss(self):
+        self.misses += 1
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def as_dict(self):
+        return {"hits": self.hits, "misses": self.misses,
+                "hit_rate": self.hit_rate, "bytes_saved": self.bytes_saved}
+
+    def __repr__(self):
+        return (f"CacheStats(hits={self.hits}, misses={self.misses}, "
+                f"hit_rate={self.hit_rate:.3f}, bytes_saved={self.bytes_saved})")
+
+
+class FrameCache:
+    """A thread-safe least-recently-used cache of images keyed by their digest.
+    The cache is bounded by the total number of bytes it holds.
+    """
+
+    def __init__(self, max_bytes=256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.stats = CacheStats()
+        self._frames = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._frames)
+
+    def __contains__(self, digest):
+        return digest in self._frames
+
+    def get(self, digest):
+        """Get the image stored under the digest, or None if it isn't held
+        """
+        with self._lock:
+            image = self._frames.get(digest)
+            if image is None:
+                self.stats.record_miss()
+                return None
+            self._frames.move_to_end(digest)
+            self.stats.record_hit(image.nbytes)
+            return image
+
+    def put(self, digest, image):
+        """Store an image under the digest, evicting the least recently used
+        images until the cache fits in max_bytes
+        """
+        if image.nbytes > self.max_bytes:
+            return
+        with self._lock:
+            old = self._frames.pop(digest, None)
+            if old is not None:
+                self.nbytes -= old.nbytes
+            self._frames[digest] = image
+            self.nbytes += image.nbytes
+            while self.nbytes > self.max_bytes:
+                _, evicted = self._frames.popitem(last=False)
+                self.nbytes -= evicted.nbytes
+
+    def clear(self):
+        with self._lock:
+            self._frames.clear()
+            self.nbytes = 0
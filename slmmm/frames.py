@@ -0,0 +1,110 @@
+"""How a 2d frame is laid out in the bytes sent for it.
+
+A frame is described by its (height, width), pixel type and its strides in
+bytes, like a numpy array. The controller sends an array in its own layout
+wherever it can (C ordered, Fortran ordered, or sliced from either), so
+serialising it is one copy of the memory it spans, and the server views the
+received bytes with the same strides rather than repacking them. Empty strides
+mean packed C order.
+"""
+import numpy as np
+from numpy.lib.stride_tricks import as_strided
+
+from slmmm import slm_pb2
+
+# arrays whose lines are padded by more than this fraction of their length are
+# packed before sending, rather than sending the padding
+MAX_PADDING = 0.5
+
+# the largest grpc message the server and controllers accept, in bytes. grpc's
+# default of 4 MB is less than a 1080p float32 frame, this is enough for a
+# float32 frame of an 8K screen (133 MB) with padded lines
+MAX_MESSAGE_LENGTH = 256 * 1024 * 1024
+MESSAGE_OPTIONS = [("grpc.max_send_message_length", MAX_MESSAGE_LENGTH),
+                   ("grpc.max_receive_message_length", MAX_MESSAGE_LENGTH)]
+
+# the numpy dtype of each pixel type, sent little endian
+PIXEL_DTYPES = {
+    slm_pb2.UINT8: np.dtype(np.uint8),
+    slm_pb2.UINT16: np.dtype("<u2"),
+    slm_pb2.FLOAT32: np.dtype("<f4"),
+}
+
+
+def pixel_type(image):
+    """Get the pixel type to send an image as, and the image converted to it
+    Integer images other than uint16 are sent as uint8, and floating point
+    images as float32
+    """
+    if image.dtype == np.uint8:
+        return slm_pb2.UINT8, image
+    if image.dtype == np.uint16:
+        return slm_pb2.UINT16, image.astype("<u2", copy=False)
+    if np.issubdtype(image.dtype, np.floating):
+        return slm_pb2.FLOAT32, image.astype("<f4", copy=False)
+    return slm_pb2.UINT8, image.astype(np.uint8)
+
+
+def line_layout(image):
+    """Get (bytes per line, transposed) for a 2d array whose rows (transposed
+    is False) or columns (transposed is True) are contiguous and don't overlap,
+    or None if neither are
+    """
+    if image.ndim != 2:
+        return None
+    height, width = image.shape
+    s0, s1 = image.strides
+    if s1 == image.itemsize and s0 >= width * image.itemsize:
+        return s0, False
+    if s0 == image.itemsize and s1 >= height * image.itemsize:
+        return s1, True
+    return None
+
+
+def serialise(image):
+    """Get the bytes to send for a 2d array, and the strides of the frame in
+    them. The strides are empty if the bytes are packed C order
+    """
+    layout = line_layout(image)
+    if image.flags.c_contiguous or image.size == 0 or layout is None:
+        return image.tobytes(), ()
+    line_bytes, transposed = layout
+    lines, line_length = image.shape[::-1] if transposed else image.shape
+    span = (lines - 1) * line_bytes + line_length * image.itemsize
+    if span > (1 + MAX_PADDING) * image.nbytes:
+        return image.tobytes(), ()
+    strides = (image.itemsize, line_bytes) if transposed else (line_bytes, image.itemsize)
+    # the bytes of the first pixel, which the whole span starts from
+    first = image[:1, :1].view(np.uint8)
+    return as_strided(first, (span,), (1,)).tobytes(), strides
+
+
+def frame_span(height, width, strides=(), dtype=np.uint8):
+    """Get the number of bytes a frame of the given shape, strides and dtype
+    spans, from its first pixel to the end of its last
+    Raises ValueError if the layout is invalid
+    """
+    itemsize = np.dtype(dtype).itemsize
+    if height < 0 or width < 0:
+        raise ValueError(f"Invalid frame size {height}x{width}")
+    if not strides:
+        return height * width * itemsize
+    if len(strides) != 2 or min(strides) < 0:
+        raise ValueError(f"Invalid frame layout {tuple(strides)} for {height}x{width}")
+    if height == 0 or width == 0:
+        return 0
+    return (height - 1) * strides[0] + (width - 1) * strides[1] + itemsize
+
+
+def deserialise(data, height, width, strides=(), dtype=np.uint8):
+    """View bytes as a 2d frame of the given shape, strides and dtype, without copying
+    Raises ValueError if the frame doesn't fit in the bytes
+    """
+    dtype = np.dtype(dtype)
+    span = frame_span(height, width, strides, dtype)
+    if not strides:
+        return np.frombuffer(data, dtype=dtype).reshape((height, width))
+    if span > len(data):
+        raise ValueError(f"A {height}x{width} frame with strides {tuple(strides)} "
+                         f"doesn't fit in {len(data)} bytes")
+    return np.ndarray((height, width), dtype, buffer=data, strides=tuple(strides))
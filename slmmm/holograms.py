@@ -0,0 +1,131 @@
+import functools
+
+import numpy as np
+
+
+@functools.lru_cache(maxsize=8)
+def coordinates(shape):
+    """Get the pixel coordinates of a screen of the given (height, width),
+    measured from its centre, as the 1d arrays (rows, columns)
+    The arrays are cached, and shouldn't be modified
+    """
+    height, width = shape
+    rows = np.arange(height, dtype=np.float64) - height // 2
+    columns = np.arange(width, dtype=np.float64) - width // 2
+    rows.flags.writeable = False
+    columns.flags.writeable = False
+    return rows, columns
+
+
+def phase_to_grey(field, out=None):
+    """Convert the phase of a complex field to a uint8 array, with 0-2pi mapped to 0-255
+    """
+    phase = np.angle(field).astype(np.float32)
+    phase *= 256 / (2 * np.pi)
+    if out is None:
+        out = np.empty(field.shape, dtype=np.uint8)
+    # negative phases wrap around into the top half of the range when cast
+    np.copyto(out, np.floor(phase).astype(np.int16), casting="unsafe")
+    return out
+
+
+class MultiSpotHologram:
+    """A gratings and lenses hologram which makes a set of spots in the far field.
+
+    Each spot is (x, y, z): x and y are its position in the far field, in units
+    of its pixels (so one grating period across the width moves a spot by one in
+    x), and z is the phase of its lens in radians at a distance of half the
+    longest side from the centre.
+
+    The field is the sum over spots of weight * exp(i(phase + grating + lens)).
+    Both the grating and lens of a spot separate into a row factor times a column
+    factor, so the whole field is one matrix product of the spots' row and column
+    factors. Moving some spots only recomputes their contribution.
+
+    phases can be an array of a phase for each spot, "random" for random phases,
+    or None for all zero.
+    """
+
+    def __init__(self, shape, spots, weights=None, phases=None, seed=None,
+                 recompute_every=256):
+        self.shape = tuple(shape)
+        self.rows, self.columns = coordinates(self.shape)
+        self.radius = max(self.shape) / 2
+        spots = np.asarray(spots, dtype=np.float64).reshape(-1, 3)
+        self.spots = spots.copy()
+        self.weights = np.ones(len(spots)) if weights is None \
+            else np.asarray(weights, dtype=np.float64).copy()
+        if phases is None:
+            self.phases = np.zeros(len(spots))
+        elif isinstance(phases, str) and phases == "random":
+            self.phases = np.random.default_rng(seed).uniform(0, 2 * np.pi, len(spots))
+        else:
+            self.phases = np.asarray(phases, dtype=np.float64).copy()
+        # updating in place slowly accumulates rounding error, so the field is
+        # recomputed from scratch after this many updates
+        self.recompute_every = recompute_every
+        self._updates = 0
+        self.field = None
+        self.recompute()
+
+    def _factors(self, spots, weights, phases):
+        """Get the (row factors, column factors) of the given spots, with the
+        weights and phases put into the column factors
+        """
+        x, y, z = (spots[:, i, None] for i in range(3))
+        height, width = self.shape
+        lens = z / self.radius ** 2
+        row_factors = np.exp(1j * (2 * np.pi * y * self.rows / height
+                                   + lens * self.rows ** 2)).astype(np.complex64)
+        column_factors = np.exp(1j * (2 * np.pi * x * self.columns / width
+                                      + lens * self.columns ** 2 + phases[:, None]))
+        column_factors *= weights[:, None]
+        return row_factors, column_factors.astype(np.complex64)
+
+    def recompute(self):
+        """Compute the field from all the spots
+        """
+        rows, columns = self._factors(self.spots, self.weights, self.phases)
+        self.field = rows.T @ columns
+        self._updates = 0
+
+    def update_spots(self, indices, spots=None, weights=None):
+        """Change the positions and/or weights of the spots at the given indices
+        Only the changed spots' contributions to the field are recomputed
+        """
+        indices = np.atleast_1d(np.asarray(indices))
+        new_spots = self.spots.copy()
+        new_weights = self.weights.copy()
+        if spots is not None:
+            new_spots[indices] = np.asarray(spots, dtype=np.float64).reshape(-1, 3)
+        if weights is not None:
+            new_weights[indices] = weights
+        if self._updates + 1 >= self.recompute_every:
+            self.spots, self.weights = new_spots, new_weights
+            self.recompute()
+            return
+        # remove the old contributions and add the new ones in one product
+        both_spots = np.concatenate([self.spots[indices], new_spots[indices]])
+        both_weights = np.concatenate([-self.weights[indices], new_weights[indices]])
+        both_phases = np.tile(self.phases[indices], 2)
+        rows, columns = self._factors(both_spots, both_weights, both_phases)
+        self.field += rows.T @ columns
+        self.spots, self.weights = new_spots, new_weights
+        self._updates += 1
+
+    def move_spots(self, indices, spots):
+        """Move the spots at the given indices to new (x, y, z) positions
+        """
+        self.update_spots(indices, spots=spots)
+
+    def frame(self, out=None):
+        """Get the hologram as a uint8 phase pattern, optionally written into out
+        """
+        return phase_to_grey(self.field, out)
+
+
+def gratings_and_lenses(shape, spots, weights=None, phases=None, seed=None):
+    """Get a uint8 gratings and lenses hologram of the given (height, width)
+    for the (x, y, z) spots. See MultiSpotHologram for the units
+    """
+    return MultiSpotHologram(shape, spots, weights, phases, seed).frame()
@@ -0,0 +1,197 @@
+"""Load test an SLM server with many concurrent clients.
+
+An offscreen SLMDisplay is started in its own process, then each client
+process sends a mix of SetImage, SetImageColour and SetScreen requests over
+its own channel, optionally at a fixed rate. Throughput, latency percentiles
+and error rates are reported per RPC and overall.
+
+    python -m slmmm.loadtest --clients 8 --sizes 512 1024 --rate 30 \\
+        --mix SetImage=8 SetImageColour=1 SetScreen=1
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import time
+import uuid
+
+import grpc
+import numpy as np
+
+from slmmm import slm_pb2
+from slmmm import slm_pb2_grpc
+from slmmm.frames import MESSAGE_OPTIONS
+
+RPCS = ("SetImage", "SetImageColour", "SetScreen")
+
+
+def run_offscreen_slm(port, use_asyncio=False):
+    """Run an SLM server on a given port with Qt's offscreen platform, so no
+    display is needed
+    """
+    os.environ["QT_QPA_PLATFORM"] = "offscreen"
+    from slmmm.slm_controller import run_slm
+    run_slm(port, use_asyncio)
+
+
+def wait_for_server(port, timeout=10.0):
+    """Block until the server on the given port accepts connections
+    """
+    with grpc.insecure_channel(f"localhost:{port}") as channel:
+        grpc.channel_ready_future(channel).result(timeout=timeout)
+
+
+def parse_mix(mix):
+    """Parse a list of "Rpc=weight" strings into a dict of weights
+    """
+    weights = {}
+    for item in mix:
+        name, _, weight = item.partition("=")
+        if name not in RPCS:
+            raise ValueError(f"Unknown rpc {name}, should be one of {RPCS}")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+def drive_client(port, sizes, rate, mix, duration, results, seed=None):
+    """Send requests to the server for duration seconds, then put a dict of
+    per-rpc latencies (in seconds), rejected and error counts on results.
+    rate is the number of requests per second to aim for, 0 sends as fast as possible
+    """
+    rng = random.Random(seed)
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    images = {size: np.random.randint(0, 256, (size, size), dtype=np.uint8) for size in sizes}
+    colours = {size: np.random.randint(0, 256, (3, size, size), dtype=np.uint8)
+               for size in sizes}
+    client_id = uuid.uuid4().hex
+    report = {name: {"latencies": [], "rejected": 0, "errors": 0} for name in names}
+    with grpc.insecure_channel(f"localhost:{port}", options=MESSAGE_OPTIONS) as channel:
+        stub = slm_pb2_grpc.SLMStub(channel)
+        start = time.perf_counter()
+        end = start + duration
+        sequence = 0
+        while True:
+            if rate:
+                next_send = start + sequence / rate
+                now = time.perf_counter()
+                if next_send > now:
+                    time.sleep(next_send - now)
+            if time.perf_counter() >= end:
+                break
+            sequence += 1
+            name = rng.choices(names, weights)[0]
+            size = rng.choice(sizes)
+            session = slm_pb2.Session(client_id=client_id, sequence=sequence)
+            sent = time.perf_counter()
+            try:
+                if name == "SetImage":
+                    response = stub.SetImage(slm_pb2.Image(
+                        image_bytes=images[size].tobytes(), width=size, height=size,
+                        session=session))
+                elif name == "SetImageColour":
+                    response = stub.SetImageColour(iter([slm_pb2.Image(
+                        image_bytes=im.tobytes(), width=size, height=size, session=session)
+                        for im in colours[size]]))
+                else:
+                    response = stub.SetScreen(slm_pb2.Screen(screen=0))
+            except grpc.RpcError:
+                report[name]["errors"] += 1
+                continue
+            report[name]["latencies"].append(time.perf_counter() - sent)
+            if not response.completed:
+                report[name]["rejected"] += 1
+    results.put(report)
+
+
+def summarise(reports, duration):
+    """Combine the client reports into throughput, latency percentiles (ms)
+    and error rates for each rpc, and for all rpcs together
+    """
+    summary = {}
+    names = sorted({name for report in reports for name in report})
+    for name in names + ["total"]:
+        parts = [report[n] for report in reports for n in report
+                 if name == "total" or n == name]
+        latencies = np.concatenate([np.asarray(p["latencies"]) for p in parts]) * 1e3
+        errors = sum(p["errors"] for p in parts)
+        rejected = sum(p["rejected"] for p in parts)
+        calls = len(latencies) + errors
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) if len(latencies) \
+            else (float("nan"),) * 3
+        summary[name] = {"calls": calls, "throughput": len(latencies) / duration,
+                         "p50": p50, "p95": p95, "p99": p99,
+                         "error_rate": errors / calls if calls else 0.0,
+                         "reject_rate": rejected / calls if calls else 0.0}
+    return summary
+
+
+def format_summary(summary):
+    lines = [f"{'rpc':>15} {'calls':>7} {'rpc/s':>8} {'p50 ms':>8} {'p95 ms':>8} "
+             f"{'p99 ms':>8} {'errors':>7} {'rejected':>8}"]
+    for name, s in summary.items():
+        lines.append(f"{name:>15} {s['calls']:7d} {s['throughput']:8.1f} {s['p50']:8.2f} "
+                     f"{s['p95']:8.2f} {s['p99']:8.2f} {s['error_rate']:7.1%} "
+                     f"{s['reject_rate']:8.1%}")
+    return "\n".join(lines)
+
+
+def run_clients(port, clients, sizes, rate, mix, duration):
+    """Drive the server on port from the given number of client processes
+    Returns the summary of their results
+    """
+    # spawn rather than fork, forking a process which has used grpc isn't safe
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    processes = [context.Process(target=drive_client,
+                                 args=(port, sizes, rate, mix, duration, results, i))
+                 for i in range(clients)]
+    for p in processes:
+        p.start()
+    reports = [results.get() for _ in processes]
+    for p in processes:
+        p.join()
+    return summarise(reports, duration)
+
+
+def load_test(port, clients=4, sizes=(512,), rate=0, mix=None, duration=5.0,
+              use_asyncio=False):
+    """Start an offscreen SLM server on port and drive it from the given number
+    of clients. Returns the summary of the results
+    """
+    mix = mix or {"SetImage": 1.0}
+    context = multiprocessing.get_context("spawn")
+    server = context.Process(target=run_offscreen_slm, args=(port, use_asyncio))
+    server.daemon = True
+    server.start()
+    try:
+        wait_for_server(port)
+        return run_clients(port, clients, list(sizes), rate, mix, duration)
+    finally:
+        server.terminate()
+        server.join()
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Load test an SLM server")
+    parser.add_argument("--port", type=int, default=50700)
+    parser.add_argument("--clients", type=int, default=4)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[512],
+                        help="square frame sizes, each request picks one at random")
+    parser.add_argument("--rate", type=float, default=0,
+                        help="requests per second per client, 0 for as fast as possible")
+    parser.add_argument("--mix", nargs="+", default=["SetImage=1"],
+                        help="relative weights of the rpcs, as Rpc=weight")
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--asyncio", action="store_true",
+                        help="use the grpc asyncio server")
+    args = parser.parse_args(args)
+    if args.clients < 1:
+        parser.error("--clients should be at least 1")
+    summary = load_test(args.port, args.clients, args.sizes, args.rate,
+                        parse_mix(args.mix), args.duration, args.asyncio)
+    print(format_summary(summary))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+import contextlib
+import gc
+import os
+import threading
+from collections import deque
+from concurrent import futures
+
+import numpy as np
+import PyQt5.QtCore as qc
+from PyQt5.QtWidgets import QApplication
+
+from slmmm import slm_pb2
+from slmmm.calibration import PATTERN_NAMES, Sweep, check_events
+from slmmm.dither import DEFAULT_SUBFRAMES, dither
+from slmmm.expand import check_expandable
+from slmmm.frames import pixel_type
+from slmmm.slm_controller import SLMController
+from slmmm.slm_server import SLMDisplay
+from slmmm.tracing import tracer
+
+
+def check_grey_frame(image, action):
+    """Check an image is a 2d uint8 array, as the server does for frames which
+    are scaled, tiled or staged. Raises ValueError if it isn't
+    """
+    if image.dtype != np.uint8:
+        raise ValueError(f"Only uint8 images can be {action}")
+    if image.ndim != 2:
+        raise ValueError(f"Only 2d images can be {action}")
+
+
+def check_colour_frame(image):
+    """Check an image has 3 uint8 channels, as the server does for colour
+    images. Raises ValueError if it doesn't
+    """
+    if len(image) != 3:
+        raise ValueError("Image should have 3 channels")
+    if any(np.asarray(channel).dtype != np.uint8 for channel in image):
+        raise ValueError("Only uint8 images can be shown in colour")
+
+
+class FrameMailbox:
+    """Commands for the display, passed from the caller's threads to the Qt GUI thread.
+    Frames are passed by reference. A replaceable command (one which just shows
+    a frame) posted straight after another which hasn't run yet replaces it,
+    as only the newest frame would be seen.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._commands = deque()
+
+    def post(self, method, *args, replaceable=False):
+        """Add a call of method(*args) to the mailbox
+        Returns True if the mailbox was empty, so the receiver needs waking
+        """
+        with self._lock:
+            was_empty = not self._commands
+            if replaceable and self._commands and self._commands[-1][2]:
+                self._commands[-1] = (method, args, replaceable)
+            else:
+                self._commands.append((method, args, replaceable))
+            return was_empty
+
+    def take(self):
+        """Remove and return all the waiting commands, as (method, args) pairs
+        """
+        with self._lock:
+            commands = [(method, args) for method, args, _ in self._commands]
+            self._commands.clear()
+            return commands
+
+
+class MailboxReceiver(qc.QObject):
+    """Runs the commands in a mailbox on the thread it lives in, when woken
+    """
+    wake = qc.pyqtSignal()
+
+    def __init__(self, mailbox):
+        super().__init__()
+        self.mailbox = mailbox
+        self.wake.connect(self.drain)
+
+    @qc.pyqtSlot()
+    def drain(self):
+        for method, args in self.mailbox.take():
+            method(*args)
+
+
+class LocalSLMController(SLMController):
+    """An SLM Controller which runs the display on a Qt GUI thread in this
+    process rather than behind a server in another one, with the same interface
+    as SLMController.
+    Images are handed to the display by reference through a mailbox, so an
+    array shouldn't be changed after it's sent. Use flush to wait until
+    everything sent has been shown.
+    use_cache, priority and compression are accepted so the two controllers
+    can be made the same way, but are ignored: frames aren't uploaded or
+    compressed, and there are no other clients to take priority over.
+    """
+
+    def __init__(self, port=None, use_cache=False, priority=0, compression=None, subframes=0):
+        super().__init__(port, use_cache=False, compression=None, subframes=subframes)
+        self.mailbox = FrameMailbox()
+        self.gui_thread = None
+        self.app = None
+        self.display = None
+        self.receiver = None
+
+    def _run_display(self, ready):
+        self.app = QApplication.instance() or QApplication([])
+        self.display = SLMDisplay("SLM-local", self.app, None)
+        self.receiver = MailboxReceiver(self.mailbox)
+        ready.set()
+        self.app.exec()
+        # Qt objects have to be destroyed on the thread they were made on
+        self.display = None
+        self.receiver = None
+        self.app = None
+        gc.collect()
+
+    def _post(self, method, *args, replaceable=False):
+        if self.mailbox.post(method, *args, replaceable=replaceable):
+            self.receiver.wake.emit()
+
+    def start_server(self, use_asyncio=False):
+        """Start the display on its own GUI thread. use_asyncio is ignored,
+        as there is no server
+        """
+        if self.gui_thread is not None and self.gui_thread.is_alive():
+            self.stop_server()
+        ready = threading.Event()
+        self.gui_thread = threading.Thread(target=self._run_display, args=(ready,),
+                                           daemon=True)
+        self.gui_thread.start()
+        ready.wait()
+
+    def _close_display(self):
+        # closing the last window quits the app, so this has to be one call
+        self.display.close()
+        self.app.quit()
+
+    def stop_server(self):
+        self._post(self._close_display)
+        self.gui_thread.join()
+        self.gui_thread = None
+
+    def flush(self, timeout=None):
+        """Block until everything sent to the display so far has been shown
+        Returns False if the timeout ran out first
+        """
+        done = threading.Event()
+        self._post(done.set)
+        return done.wait(timeout)
+
+    def set_image(self, image: np.ndarray):
+        """Put the given uint8 numpy array onto the slm screen
+        A uint16 (grey levels times 256) or floating point (grey levels) array
+        is shown with finer grey levels, by cycling through uint8 sub-frames
+        Raises ValueError if the image is empty
+        """
+        if image.size == 0:
+            raise ValueError("The image is empty")
+        kind, image = pixel_type(image)
+        trace_id = tracer.new_trace_id()
+        with tracer.span("LocalSLMController.set_image", trace_id, nbytes=image.nbytes):
+            if kind != slm_pb2.UINT8:
+                with tracer.span("dither", trace_id):
+                    subframes = dither(image, self.subframes or DEFAULT_SUBFRAMES)
+                tracer.begin("signal hop", trace_id)
+                self._post(self.display.set_image_dithered, subframes, trace_id,
+                           replaceable=True)
+                return
+            tracer.begin("signal hop", trace_id)
+            self._post(self.display.set_image, image, trace_id,
+                       replaceable=True)
+
+    @contextlib.contextmanager
+    def _frame_sender(self):
+        # the pipeline frees each frame's memory once it's sent, so the display
+        # needs its own copy
+        yield lambda image: self.set_image(image.copy())
+
+    def set_image_scaled(self, image: np.ndarray, scale: int):
+        """Put the given low resolution uint8 numpy array onto the slm screen,
+        with each pixel shown as a scale x scale block of pixels
+        Raises ValueError if the image isn't a non-empty 2d uint8 array or the
+        scale is less than one
+        """
+        check_grey_frame(image, "scaled or tiled")
+        check_expandable(image, scale)
+        self._post(self.display.set_image_blocks, image, scale, replaceable=True)
+
+    def set_image_tiled(self, period: np.ndarray):
+        """Fill the slm screen by repeating the given uint8 numpy array, which is
+        one period of a pattern, starting from the top left
+        Raises ValueError if the period isn't a non-empty 2d uint8 array
+        """
+        check_grey_frame(period, "scaled or tiled")
+        check_expandable(period)
+        self._post(self.display.set_image_tiled, period, replaceable=True)
+
+    def set_image_colour(self, image: np.ndarray):
+        """Put the given colour uint8 numpy array onto the slm screen
+        The image should have axes [colour, height, width]
+        Raises ValueError if it doesn't have 3 uint8 channels
+        """
+        check_colour_frame(image)
+        self._post(self.display.set_image_colour, np.stack(image, axis=2), replaceable=True)
+
+    def stage_image(self, image: np.ndarray):
+        """Put the given uint8 numpy array into the slm's back buffer
+        without displaying it. Call swap to show it.
+        Raises ValueError if the image isn't a 2d uint8 array
+        """
+        check_grey_frame(image, "staged")
+        self._post(self.display.stage_image, image)
+
+    def swap(self):
+        """Show the staged image on the slm screen
+        """
+        self._post(self.display.swap)
+
+    def set_screen(self, screen: int):
+        """Put the slm on the given screen
+        """
+        self._post(self.display.set_screen, screen)
+        self._display_info = None
+
+    def calibration_sweep(self, pattern="uniform", levels=None, dwell=1, reference=0, period=8):
+        """Step the slm through calibration frames, each shown for dwell screen
+        refreshes. See SLMController.calibration_sweep
+        """
+        try:
+            sweep = Sweep(PATTERN_NAMES[pattern], levels, dwell, reference, period)
+            self._post(self.display.run_sweep, sweep)
+        except ValueError as e:
+            sweep = Sweep.failed(str(e))
+        try:
+            yield from check_events(sweep)
+        finally:
+            sweep.cancel()
+
+    def displayed_frame(self):
+        """Get what the slm screen shows once everything sent so far is shown,
+        as a uint8 array of the screen's (height, width), rendered exactly as
+        the display paints it
+        """
+        future = futures.Future()
+        self._post(self.display.capture_to, future)
+        return future.result()
+
+    def _get_display_info(self):
+        self.flush()
+        return self.display.display_info
+
+    def _get_server_trace(self):
+        # the display shares this process's tracer
+        return []
+
+
+def open_controller(port=None, local=None, **kwargs):
+    """Get a controller for an slm. If local is True the display runs in this
+    process (LocalSLMController), otherwise it runs behind a server on the
+    given port (SLMController). The keyword arguments (use_cache, priority,
+    compression, subframes) are passed on to the controller.
+    If local isn't given, it's taken from the SLMMM_LOCAL environment
+    variable, so scripts can switch modes without changing.
+    """
+    if local is None:
+        local = os.environ.get("SLMMM_LOCAL", "0") not in ("", "0")
+    if local:
+        return LocalSLMController(port, **kwargs)
+    return SLMController(port, **kwargs)
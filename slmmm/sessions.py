@@ -0,0 +1,91 @@
+import itertools
+import threading
+import time
+from collections import OrderedDict
+
+
+class FrameSequencer:
+    """Decides which frames from concurrent requests make it onto the screen.
+
+    Each request takes a ticket when its handler starts. A frame is rejected if
+    - its client has already shown a frame with a higher sequence number
+    - a different client has shown a frame from a request which arrived later
+    - a different client with a higher priority has shown a frame within the
+      last priority_hold seconds
+    Accepted frames are shown while holding the lock, so the order they reach
+    the display is the order they were accepted in.
+    A client which hasn't shown a frame for client_timeout seconds is
+    forgotten, so the state kept doesn't grow with every client ever seen.
+    """
+
+    def __init__(self, priority_hold=1.0, client_timeout=600.0):
+        self.priority_hold = priority_hold
+        self.client_timeout = client_timeout
+        self.accepted = 0
+        self.rejected = 0
+        self._tickets = itertools.count(1)
+        self._lock = threading.Lock()
+        # the last sequence number shown from each client, and when, in the
+        # order the clients last showed a frame
+        self._last_sequence = OrderedDict()
+        self._last_ticket = 0
+        self._last_client = None
+        self._holder = None
+
+    def ticket(self):
+        """Take a ticket marking the arrival order of a request
+        """
+        return next(self._tickets)
+
+    def submit(self, ticket, session, show):
+        """Call show() if the frame from the given session should be displayed
+        Returns None if the frame was shown, otherwise the reason it was rejected
+        """
+        client_id = session.client_id
+        with self._lock:
+            error = self._check(ticket, session)
+            if error is not None:
+                self.rejected += 1
+                return error
+            show()
+            now = time.monotonic()
+            self.accepted += 1
+            self._last_ticket = max(ticket, self._last_ticket)
+            self._last_client = client_id
+            if client_id:
+                if session.sequence:
+                    self._last_sequence[client_id] = (session.sequence, now)
+                    self._last_sequence.move_to_end(client_id)
+                self._holder = (client_id, session.priority, now)
+            self._expire(now)
+            return None
+
+    def _check(self, ticket, session):
+        client_id = session.client_id
+        if client_id and session.sequence \
+                and session.sequence <= self._last_sequence.get(client_id, (0, 0))[0]:
+            return "Stale frame, a newer frame from this client was already shown"
+        if (client_id != self._last_client or not client_id) \
+                and ticket < self._last_ticket:
+            return "Stale frame, a newer frame was already shown"
+        if self._holder is not None:
+            holder_id, holder_priority, shown_at = self._holder
+            if holder_id != client_id and holder_priority > session.priority \
+                    and time.monotonic() - shown_at < self.priority_hold:
+                return "The display is held by a higher priority client"
+        return None
+
+    def _expire(self, now):
+        while self._last_sequence:
+            _, shown_at = next(iter(self._last_sequence.values()))
+            if now - shown_at < self.client_timeout:
+                return
+            self._last_sequence.popitem(last=False)
+
+    def forget(self, client_id):
+        """Drop the state kept for a client, so it can start its sequence again
+        """
+        with self._lock:
+            self._last_sequence.pop(client_id, None)
+            if self._holder is not None and self._holder[0] == client_id:
+                self._holder = None
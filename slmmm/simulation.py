@@ -0,0 +1,122 @@
+"""A simulated optical bench, for testing closed loops without an slm or a camera.
+
+SimulatedCamera looks at the far field of whatever the slm shows: it takes the
+frame the display paints (controller.displayed_frame, which works with the
+offscreen Qt platform), treats its grey levels as phase, and propagates it
+with an FFT, with optional aberrations, noise and exposure latency.
+"""
+import time
+
+import numpy as np
+
+from slmmm.holograms import coordinates
+
+# the phase factor of each uint8 grey level, with 0-255 spanning 0-2pi
+PHASE_FACTORS = np.exp(2j * np.pi * np.arange(256) / 256).astype(np.complex64)
+
+# Zernike polynomials (unnormalised) of the coordinates x, y scaled so the
+# pupil's radius is one
+ABERRATIONS = {
+    "tilt_x": lambda x, y, r2: x,
+    "tilt_y": lambda x, y, r2: y,
+    "defocus": lambda x, y, r2: 2 * r2 - 1,
+    "astigmatism": lambda x, y, r2: x ** 2 - y ** 2,
+    "oblique_astigmatism": lambda x, y, r2: 2 * x * y,
+    "coma_x": lambda x, y, r2: (3 * r2 - 2) * x,
+    "coma_y": lambda x, y, r2: (3 * r2 - 2) * y,
+    "spherical": lambda x, y, r2: 6 * r2 ** 2 - 6 * r2 + 1,
+}
+
+
+def aberration_phase(shape, aberrations):
+    """Get the phase (in radians) over a slm of the given (height, width) of a
+    dict of {aberration name: amplitude in radians}, see ABERRATIONS.
+    The pupil's radius is half the longest side, like holograms.MultiSpotHologram
+    """
+    rows, columns = coordinates(tuple(shape))
+    radius = max(shape) / 2
+    y, x = rows[:, None] / radius, columns[None, :] / radius
+    r2 = x ** 2 + y ** 2
+    phase = np.zeros(shape)
+    for name, amplitude in aberrations.items():
+        if name not in ABERRATIONS:
+            raise ValueError(f"Unknown aberration {name}, should be one of {list(ABERRATIONS)}")
+        phase = phase + amplitude * ABERRATIONS[name](x, y, r2)
+    return phase
+
+
+class SimulatedCamera:
+    """A camera in the far field (the focal plane of a lens) of the slm.
+
+    source is called for each capture to get the uint8 frame on the slm, such
+    as controller.displayed_frame. Grey levels are phase, as in holograms.
+    The slm is lit by a uniform beam, or a gaussian one of the given waist
+    (1/e^2 radius, in pixels), through a pupil with the given aberrations (see
+    aberration_phase). Images are intensities, scaled so all of the light in
+    one pixel is 1, then multiplied by gain, clipped at saturation and given
+    gaussian noise with a standard deviation of noise.
+
+    A capture takes at least exposure + latency seconds, like a camera which
+    integrates for the exposure and then takes latency to read out. The slm's
+    frame is taken at the start of the exposure.
+    """
+
+    def __init__(self, source, aberrations=None, beam_waist=None, gain=1.0,
+                 saturation=1.0, noise=0.0, exposure=0.0, latency=0.0, seed=None):
+        self.source = source
+        self.aberrations = dict(aberrations or {})
+        self.beam_waist = beam_waist
+        self.gain = gain
+        self.saturation = saturation
+        self.noise = noise
+        self.exposure = exposure
+        self.latency = latency
+        self.rng = np.random.default_rng(seed)
+        self._pupils = {}
+
+    def pupil(self, shape):
+        """Get the complex field the slm is lit with, including the aberrations
+        Worked out once for each shape of frame
+        """
+        shape = tuple(shape)
+        if shape not in self._pupils:
+            amplitude = np.ones(shape)
+            if self.beam_waist is not None:
+                rows, columns = coordinates(shape)
+                amplitude = np.exp(-(rows[:, None] ** 2 + columns[None, :] ** 2)
+                                   / self.beam_waist ** 2)
+            # normalised so the far field's total intensity is 1 (the FFT
+            # multiplies the total by the number of pixels)
+            amplitude = amplitude / np.sqrt(amplitude.size * np.sum(amplitude ** 2))
+            phase = aberration_phase(shape, self.aberrations)
+            self._pupils[shape] = (amplitude * np.exp(1j * phase)).astype(np.complex64)
+        return self._pupils[shape]
+
+    def far_field(self, frame):
+        """Get the noiseless far field intensity of a uint8 slm frame, as a float32
+        array of the same shape with the zeroth order in the centre
+        """
+        field = PHASE_FACTORS[frame]
+        field *= self.pupil(frame.shape)
+        spectrum = np.fft.fftshift(np.fft.fft2(field))
+        return (spectrum.real ** 2 + spectrum.imag ** 2).astype(np.float32, copy=False)
+
+    def image(self, frame):
+        """Get the camera image of a uint8 slm frame, with gain, saturation and noise
+        """
+        image = self.far_field(frame)
+        if self.gain != 1:
+            image *= self.gain
+        if self.noise:
+            image += self.noise * self.rng.standard_normal(image.shape, dtype=np.float32)
+        return np.clip(image, 0, self.saturation, out=image)
+
+    def capture(self):
+        """Take an image of what the slm is showing
+        """
+        start = time.perf_counter()
+        image = self.image(np.asarray(self.source()))
+        remaining = start + self.exposure + self.latency - time.perf_counter()
+        if remaining > 0:
+            time.sleep(remaining)
+        return image
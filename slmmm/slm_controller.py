@@ -1,15 +1,26 @@
+import contextlib
+import itertools
+import json
 import multiprocessing
+import threading
+import uuid
 import grpc
 import numpy as np
 import socket
 import time
+from collections import deque
 
 from PyQt5.QtWidgets import QApplication
 
 from slmmm import slm_pb2
 from slmmm import slm_pb2_grpc
+from slmmm.calibration import PATTERN_NAMES, check_events
+from slmmm.compression import CODEC_NAMES, CompressionPolicy
+from slmmm.frame_cache import CacheStats, serialised_digest
+from slmmm.frames import MESSAGE_OPTIONS, pixel_type, serialise
+from slmmm.tracing import dump_chrome_trace, trace_metadata, tracer
 
-from slmmm.slm_server import SLMDisplay
+from slmmm.slm_server import SLMDisplay, decode_image
 
 
 def is_port_in_use(port):
@@ -26,24 +37,127 @@ def is_port_in_use(port):
     return in_use
 
 
-def run_slm(port):
+def check_response(response):
+    """Raise ValueError with the server's error if a request wasn't completed
+    """
+    if not response.completed:
+        raise ValueError(response.error)
+
+
+def run_slm(port, use_asyncio=False):
     """Run an SLM server on a given port
     """
     app = QApplication([])
-    display = SLMDisplay(f"SLM-{port}", app, port)
+    display = SLMDisplay(f"SLM-{port}", app, port, use_asyncio=use_asyncio)
     app.exec()
 
 
+def generate_to_shared_memory(generator_fn, param):
+    """Run generator_fn(param) and copy the resulting frame into a new shared
+    memory block. This runs in a pool worker, the caller owns the block.
+    Returns the block's name and the frame's shape and dtype
+    """
+    # shared_memory is new in python 3.8, so it's imported where it's used
+    from multiprocessing import resource_tracker, shared_memory
+    frame = np.asarray(generator_fn(param))
+    block = shared_memory.SharedMemory(create=True, size=max(frame.nbytes, 1))
+    np.ndarray(frame.shape, frame.dtype, buffer=block.buf)[...] = frame
+    block.close()
+    # the parent process unlinks the block, so stop this process's tracker from
+    # also trying to clean it up
+    resource_tracker.unregister(block._name, "shared_memory")
+    return block.name, frame.shape, frame.dtype.str
+
+
+def release_shared_memory(name):
+    """Unlink a shared memory block created by generate_to_shared_memory
+    """
+    from multiprocessing import shared_memory
+    block = shared_memory.SharedMemory(name=name)
+    block.close()
+    block.unlink()
+
+
 class SLMController:
     """An SLM Controller which runs a server in a separate process and can send
     commands to it on that port.
     The server halts when the parent process is killed.
+    If use_cache is True, images are identified by a content hash first and
+    only uploaded if the server doesn't already hold them.
+    Each controller is its own client session: its frames are numbered in the
+    order they're submitted, and the server drops frames older than one it has
+    shown. While a controller with a higher priority is displaying, frames from
+    lower priority controllers are rejected.
+    compression is the codec ("zlib", "lzma" or "bz2") to compress images
+    with when it's expected to get them to the server sooner, or None to never
+    compress. It's turned off if the server doesn't support the codec.
+    uint16 and floating point images are shown by temporal dithering over
+    subframes sub-frames, or the server's default number if it's 0.
     """
 
-    def __init__(self, port):
+    def __init__(self, port, use_cache=True, priority=0, compression="zlib", subframes=0):
         self.port = port
+        self.subframes = subframes
+        self.use_cache = use_cache
+        self.cache_stats = CacheStats()
+        self.compression = None if compression is None \
+            else CompressionPolicy(CODEC_NAMES[compression])
+        self._compression_checked = False
+        self.client_id = uuid.uuid4().hex
+        self.priority = priority
+        self._sequence = itertools.count(1)
+        self._sequence_lock = threading.Lock()
+        self._display_info = None
+        self._frame_buffer = None
+
+    def _encode(self, image, trace_id=0):
+        """Get the bytes to send for an image, in the image's own layout, with
+        the strides of the image in them and the codec they're compressed with
+        """
+        with tracer.span("serialise", trace_id):
+            image_bytes, strides = serialise(image)
+        payload, codec = self._compress(image_bytes, trace_id)
+        return payload, strides, codec
+
+    def _compress(self, image_bytes, trace_id=0):
+        """Get the payload to send for serialised image bytes and the codec
+        it's compressed with
+        """
+        if self.compression is not None and not self._compression_checked:
+            self._compression_checked = True
+            if self.compression.codec not in self.display_info().compression_codecs:
+                self.compression = None
+        if self.compression is None:
+            return image_bytes, slm_pb2.NO_COMPRESSION
+        with tracer.span("compress", trace_id):
+            return self.compression.encode(image_bytes)
+
+    def _record_send(self, nbytes, start):
+        if self.compression is not None:
+            self.compression.record_send(nbytes, time.perf_counter() - start)
+
+    def compression_stats(self):
+        """Get a dict of the number of frames compressed, the bytes before and
+        after compression, the compression ratio and time spent compressing, and
+        the measured link and compression rates (bytes/s)
+        """
+        return {} if self.compression is None else self.compression.stats()
+
+    def _channel(self):
+        return grpc.insecure_channel(f"localhost:{self.port}", options=MESSAGE_OPTIONS)
+
+    def _session(self):
+        """Get the session for a new frame, with the next sequence number
+        """
+        with self._sequence_lock:
+            sequence = next(self._sequence)
+        return slm_pb2.Session(client_id=self.client_id, sequence=sequence,
+                               priority=self.priority)
 
-    def start_server(self):
+    def start_server(self, use_asyncio=False):
+        """Start the server process. If use_asyncio is True the server uses
+        grpc's asyncio implementation instead of a thread pool
+        """
         try:
             self.slm_server.terminate()
         except:
@@ -53,7 +167,7 @@ class SLMController:
             print("Port already in use. Choose another port.")
         else:
             self.slm_server = multiprocessing.Process(
-                target=run_slm, args=(self.port,))
+                target=run_slm, args=(self.port, use_asyncio))
             self.slm_server.daemon = True
             self.slm_server.start()
         time.sleep(0.1)
@@ -61,26 +175,271 @@ class SLMController:
     def stop_server(self):
         self.slm_server.terminate()
 
+    def _get_server_trace(self):
+        with self._channel() as channel:
+            stub = slm_pb2_grpc.SLMStub(channel)
+            return json.loads(stub.GetTrace(slm_pb2.EmptyParams()).events_json)
+
+    def dump_trace(self, path):
+        """Write the spans recorded for traced frames by this process and by the
+        server to one Chrome trace event json file at path.
+        Set slmmm.tracing.tracer.enabled = True (or the SLMMM_TRACE environment
+        variable) to trace frames
+        """
+        dump_chrome_trace(path, tracer.chrome_events() + self._get_server_trace())
+
+    def flush(self, timeout=None):
+        """Block until everything sent so far has reached the server. Calls to
+        the server are synchronous, so this returns True straight away, it's
+        here so code can switch between this and LocalSLMController
+        """
+        return True
+
     def set_image(self, image: np.ndarray):
         """Put the given uint8 numpy array onto the slm screen
+        A uint16 (grey levels times 256) or floating point (grey levels) array
+        is shown with finer grey levels, by cycling through uint8 sub-frames
         """
-        with grpc.insecure_channel(f"localhost:{self.port}") as channel:
+        with self._channel() as channel:
+            self._set_image(slm_pb2_grpc.SLMStub(channel), image)
+
+    def _set_image(self, stub, image):
+        kind, image = pixel_type(image)
+        trace_id = tracer.new_trace_id()
+        metadata = trace_metadata(trace_id)
+        with tracer.span("SLMController.set_image", trace_id, nbytes=image.nbytes):
+            session = self._session()
+            with tracer.span("serialise", trace_id):
+                image_bytes, strides = serialise(image)
+            digest = b""
+            if self.use_cache:
+                # the server caches dithered images as their sub-frames, so the
+                # number of sub-frames is part of what's cached
+                variant = "" if kind == slm_pb2.UINT8 else f"subframes={self.subframes}"
+                with tracer.span("frame_digest", trace_id):
+                    digest = serialised_digest(image_bytes, strides, image.shape,
+                                               image.dtype, variant)
+                with tracer.span("send SetCachedImage", trace_id):
+                    reply = stub.SetCachedImage(
+                        slm_pb2.ImageDigest(digest=digest, session=session), metadata=metadata)
+                if reply.hit:
+                    self.cache_stats.record_hit(image.nbytes)
+                    if reply.error:
+                        raise ValueError(reply.error)
+                    return
+                self.cache_stats.record_miss()
+            image_bytes, codec = self._compress(image_bytes, trace_id)
+            with tracer.span("send SetImage", trace_id):
+                start = time.perf_counter()
+                response = stub.SetImage(
+                    slm_pb2.Image(image_bytes=image_bytes,
+                                  width=image.shape[1], height=image.shape[0],
+                                  strides=strides, digest=digest, session=session,
+                                  compression=codec, pixel_type=kind,
+                                  subframes=self.subframes),
+                    metadata=metadata)
+                self._record_send(len(image_bytes), start)
+            check_response(response)
+
+    @contextlib.contextmanager
+    def _frame_sender(self):
+        """Open one channel for sending many images
+        Yields a function which puts an image on the slm screen
+        """
+        with self._channel() as channel:
             stub = slm_pb2_grpc.SLMStub(channel)
-            stub.SetImage(slm_pb2.Image(image_bytes=image.tobytes(),
-                                        width=image.shape[0], height=image.shape[1]))
+            yield lambda image: self._set_image(stub, image)
+
+    def run_pipeline(self, generator_fn, params, processes=None, lookahead=None,
+                     callback=None):
+        """Generate a frame for each of params with generator_fn(param) in a
+        process pool, and put the frames on the slm screen in the order of params.
+        generator_fn must be picklable (defined at the top level of a module).
+        Frames are passed back from the pool through shared memory, and at most
+        lookahead frames (default twice the number of processes) are generated
+        ahead of the one on screen.
+        If given, callback(index, param, frame) is called after each frame is
+        sent, with a copy of the frame which it may keep.
+        Returns the number of frames sent. Needs python 3.8 or later
+        """
+        from multiprocessing import shared_memory
+        processes = processes or multiprocessing.cpu_count()
+        lookahead = lookahead or 2 * processes
+        params = iter(params)
+        pending = deque()
+        sent = 0
+
+        def submit(pool):
+            for param in params:
+                pending.append((param, pool.apply_async(
+                    generate_to_shared_memory, (generator_fn, param))))
+                return
+
+        with multiprocessing.Pool(processes) as pool, self._frame_sender() as send:
+            try:
+                for _ in range(lookahead):
+                    submit(pool)
+                while pending:
+                    param, result = pending.popleft()
+                    name, shape, dtype = result.get()
+                    submit(pool)
+                    block = shared_memory.SharedMemory(name=name)
+                    try:
+                        frame = np.ndarray(shape, dtype, buffer=block.buf)
+                        send(frame)
+                        # the block is freed below, so the callback gets its own copy
+                        kept = frame.copy() if callback is not None else None
+                        del frame
+                    finally:
+                        block.close()
+                        block.unlink()
+                    if callback is not None:
+                        callback(sent, param, kept)
+                    sent += 1
+            finally:
+                # free the blocks of any frames that were generated but not sent
+                for _, result in pending:
+                    try:
+                        release_shared_memory(result.get()[0])
+                    except Exception:
+                        pass
+        return sent
+
+    def set_image_scaled(self, image: np.ndarray, scale: int):
+        """Put the given low resolution uint8 numpy array onto the slm screen,
+        with each pixel shown as a scale x scale block of pixels
+        """
+        kind, image = pixel_type(image)
+        with self._channel() as channel:
+            stub = slm_pb2_grpc.SLMStub(channel)
+            trace_id = tracer.new_trace_id()
+            with tracer.span("SLMController.set_image_scaled", trace_id, nbytes=image.nbytes):
+                image_bytes, strides = serialise(image)
+                check_response(stub.SetImage(
+                    slm_pb2.Image(image_bytes=image_bytes, strides=strides,
+                                  width=image.shape[1], height=image.shape[0],
+                                  pixel_type=kind, block_scale=scale, session=self._session()),
+                    metadata=trace_metadata(trace_id)))
+
+    def set_image_tiled(self, period: np.ndarray):
+        """Fill the slm screen by repeating the given uint8 numpy array, which is
+        one period of a pattern, starting from the top left
+        """
+        kind, period = pixel_type(period)
+        with self._channel() as channel:
+            stub = slm_pb2_grpc.SLMStub(channel)
+            trace_id = tracer.new_trace_id()
+            with tracer.span("SLMController.set_image_tiled", trace_id, nbytes=period.nbytes):
+                image_bytes, strides = serialise(period)
+                check_response(stub.SetImage(
+                    slm_pb2.Image(image_bytes=image_bytes, strides=strides,
+                                  width=period.shape[1], height=period.shape[0],
+                                  pixel_type=kind, tile=True, session=self._session()),
+                    metadata=trace_metadata(trace_id)))
 
     def set_image_colour(self, image: np.ndarray):
         """Put the given colour uint8 numpy array onto the slm screen
         The image should have axes [colour, height, width]
         """
-        with grpc.insecure_channel(f"localhost:{self.port}") as channel:
+        session = self._session()
+        channels = []
+        for plane in image:
+            kind, plane = pixel_type(plane)
+            channels.append((kind,) + serialise(plane))
+        with self._channel() as channel:
+            stub = slm_pb2_grpc.SLMStub(channel)
+            check_response(stub.SetImageColour(iter([
+                slm_pb2.Image(image_bytes=image_bytes, strides=strides,
+                              width=image.shape[2], height=image.shape[1],
+                              pixel_type=kind, session=session)
+                for kind, image_bytes, strides in channels])))
+
+    def stage_image(self, image: np.ndarray):
+        """Upload the given uint8 numpy array into the slm's back buffer
+        without displaying it. Call swap to show it.
+        """
+        kind, image = pixel_type(image)
+        image_bytes, strides, codec = self._encode(image)
+        with self._channel() as channel:
+            stub = slm_pb2_grpc.SLMStub(channel)
+            start = time.perf_counter()
+            response = stub.StageImage(slm_pb2.Image(image_bytes=image_bytes, strides=strides,
+                                                     width=image.shape[1], height=image.shape[0],
+                                                     compression=codec, pixel_type=kind))
+            self._record_send(len(image_bytes), start)
+        check_response(response)
+
+    def swap(self):
+        """Show the staged image on the slm screen
+        """
+        with self._channel() as channel:
             stub = slm_pb2_grpc.SLMStub(channel)
-            stub.SetImageColour(iter([slm_pb2.Image(image_bytes=im.tobytes(),
-                                                    width=im.shape[0], height=im.shape[1]) for im in image]))
+            check_response(stub.Swap(slm_pb2.EmptyParams()))
 
     def set_screen(self, screen: int):
         """Put the slm on the given screen
         """
-        with grpc.insecure_channel(f"localhost:{self.port}") as channel:
+        with self._channel() as channel:
             stub = slm_pb2_grpc.SLMStub(channel)
-            stub.SetScreen(slm_pb2.Screen(screen=screen))
+            response = stub.SetScreen(slm_pb2.Screen(screen=screen))
+        self._display_info = None
+        check_response(response)
+
+    def _get_display_info(self):
+        with self._channel() as channel:
+            stub = slm_pb2_grpc.SLMStub(channel)
+            return stub.GetDisplayInfo(slm_pb2.EmptyParams())
+
+    def calibration_sweep(self, pattern="uniform", levels=None, dwell=1, reference=0, period=8):
+        """Step the slm through calibration frames generated by the server,
+        each shown for dwell screen refreshes.
+        pattern is "uniform" (the whole screen at each level), "split" (the
+        left half at the reference level, the right half at each level) or
+        "phase_steps" (stripes period pixels wide alternating between the
+        reference level and each level). levels are the grey levels to step
+        through, all 256 by default.
+        Yields a SweepEvent as each frame is taken off the screen, with its
+        index, level, and the wall clock times (time.time_ns) it was put on the
+        screen and first painted. Raises RuntimeError if the sweep can't run
+        or is interrupted. Stopping early cancels the rest of the sweep
+        """
+        request = slm_pb2.CalibrationSweep(
+            pattern=PATTERN_NAMES[pattern], levels=[] if levels is None else levels,
+            dwell_refreshes=dwell, reference_level=reference, period=period,
+            session=self._session())
+        with self._channel() as channel:
+            stub = slm_pb2_grpc.SLMStub(channel)
+            yield from check_events(stub.RunCalibrationSweep(request))
+
+    def displayed_frame(self):
+        """Get what the slm screen shows, as a uint8 array of the screen's
+        (height, width), rendered exactly as the display paints it
+        """
+        with self._channel() as channel:
+            stub = slm_pb2_grpc.SLMStub(channel)
+            return decode_image(stub.GetFrame(slm_pb2.EmptyParams()))
+
+    def display_info(self, refresh=False):
+        """Get the screens the slm can be shown on (a ScreenReply), with their
+        geometry and refresh rates, and the index of the one in use.
+        The reply is cached until the screen is changed or refresh is True
+        """
+        if self._display_info is None or refresh:
+            self._display_info = self._get_display_info()
+        return self._display_info
+
+    def screen_shape(self):
+        """Get the (height, width) of the screen the slm is on
+        """
+        info = self.display_info()
+        screen = info.screens[info.active_screen]
+        return screen.height, screen.width
+
+    def frame_buffer(self):
+        """Get a uint8 array the size of the slm screen to draw frames into.
+        The same array is returned each call, until the screen's size changes
+        """
+        shape = self.screen_shape()
+        if self._frame_buffer is None or self._frame_buffer.shape != shape:
+            self._frame_buffer = np.zeros(shape, dtype=np.uint8)
+        return self._frame_buffer
@@ -1,11 +1,12 @@
 # -*- coding: utf-8 -*-
 # Generated by the protocol buffer compiler.  DO NOT EDIT!
 # source: slm.proto
+# Protobuf Python Version: 4.25.1
 """Generated protocol buffer code."""
 from google.protobuf import descriptor as _descriptor
-from google.protobuf import message as _message
-from google.protobuf import reflection as _reflection
+from google.protobuf import descriptor_pool as _descriptor_pool
 from google.protobuf import symbol_database as _symbol_database
+from google.protobuf.internal import builder as _builder
 # @@protoc_insertion_point(imports)
 
 _sym_db = _symbol_database.Default()
@@ -13,335 +14,45 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor.FileDescriptor(
-  name='slm.proto',
-  package='slm',
-  syntax='proto3',
-  serialized_options=None,
-  create_key=_descriptor._internal_create_key,
-  serialized_pb=b'\n\tslm.proto\x12\x03slm\";\n\x05Image\x12\x13\n\x0bimage_bytes\x18\x01 \x01(\x0c\x12\r\n\x05width\x18\x02 \x01(\x05\x12\x0e\n\x06height\x18\x03 \x01(\x05\"\"\n\x0bScreenReply\x12\x13\n\x0bnum_screens\x18\x04 \x01(\x05\"\x18\n\x06Screen\x12\x0e\n\x06screen\x18\x05 \x01(\x05\" \n\x08Position\x12\t\n\x01x\x18\x06 \x01(\x05\x12\t\n\x01y\x18\x07 \x01(\x05\"\r\n\x0b\x45mptyParams\",\n\x08Response\x12\x11\n\tcompleted\x18\x08 \x01(\x08\x12\r\n\x05\x65rror\x18\t \x01(\t2\xb9\x01\n\x03SLM\x12\'\n\x08SetImage\x12\n.slm.Image\x1a\r.slm.Response\"\x00\x12/\n\x0eSetImageColour\x12\n.slm.Image\x1a\r.slm.Response\"\x00(\x01\x12)\n\tSetScreen\x12\x0b.slm.Screen\x1a\r.slm.Response\"\x00\x12-\n\x0bSetPosition\x12\r.slm.Position\x1a\r.slm.Response\"\x00\x62\x06proto3'
-)
-
-
-
-
-_IMAGE = _descriptor.Descriptor(
-  name='Image',
-  full_name='slm.Image',
-  filename=None,
-  file=DESCRIPTOR,
-  containing_type=None,
-  create_key=_descriptor._internal_create_key,
-  fields=[
-    _descriptor.FieldDescriptor(
-      name='image_bytes', full_name='slm.Image.image_bytes', index=0,
-      number=1, type=12, cpp_type=9, label=1,
-      has_default_value=False, default_value=b"",
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
-    _descriptor.FieldDescriptor(
-      name='width', full_name='slm.Image.width', index=1,
-      number=2, type=5, cpp_type=1, label=1,
-      has_default_value=False, default_value=0,
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
-    _descriptor.FieldDescriptor(
-      name='height', full_name='slm.Image.height', index=2,
-      number=3, type=5, cpp_type=1, label=1,
-      has_default_value=False, default_value=0,
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
-  ],
-  extensions=[
-  ],
-  nested_types=[],
-  enum_types=[
-  ],
-  serialized_options=None,
-  is_extendable=False,
-  syntax='proto3',
-  extension_ranges=[],
-  oneofs=[
-  ],
-  serialized_start=18,
-  serialized_end=77,
-)
-
-
-_SCREENREPLY = _descriptor.Descriptor(
-  name='ScreenReply',
-  full_name='slm.ScreenReply',
-  filename=None,
-  file=DESCRIPTOR,
-  containing_type=None,
-  create_key=_descriptor._internal_create_key,
-  fields=[
-    _descriptor.FieldDescriptor(
-      name='num_screens', full_name='slm.ScreenReply.num_screens', index=0,
-      number=4, type=5, cpp_type=1, label=1,
-      has_default_value=False, default_value=0,
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
-  ],
-  extensions=[
-  ],
-  nested_types=[],
-  enum_types=[
-  ],
-  serialized_options=None,
-  is_extendable=False,
-  syntax='proto3',
-  extension_ranges=[],
-  oneofs=[
-  ],
-  serialized_start=79,
-  serialized_end=113,
-)
-
-
-_SCREEN = _descriptor.Descriptor(
-  name='Screen',
-  full_name='slm.Screen',
-  filename=None,
-  file=DESCRIPTOR,
-  containing_type=None,
-  create_key=_descriptor._internal_create_key,
-  fields=[
-    _descriptor.FieldDescriptor(
-      name='screen', full_name='slm.Screen.screen', index=0,
-      number=5, type=5, cpp_type=1, label=1,
-      has_default_value=False, default_value=0,
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
-  ],
-  extensions=[
-  ],
-  nested_types=[],
-  enum_types=[
-  ],
-  serialized_options=None,
-  is_extendable=False,
-  syntax='proto3',
-  extension_ranges=[],
-  oneofs=[
-  ],
-  serialized_start=115,
-  serialized_end=139,
-)
-
-
-_POSITION = _descriptor.Descriptor(
-  name='Position',
-  full_name='slm.Position',
-  filename=None,
-  file=DESCRIPTOR,
-  containing_type=None,
-  create_key=_descriptor._internal_create_key,
-  fields=[
-    _descriptor.FieldDescriptor(
-      name='x', full_name='slm.Position.x', index=0,
-      number=6, type=5, cpp_type=1, label=1,
-      has_default_value=False, default_value=0,
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
-    _descriptor.FieldDescriptor(
-      name='y', full_name='slm.Position.y', index=1,
-      number=7, type=5, cpp_type=1, label=1,
-      has_default_value=False, default_value=0,
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
-  ],
-  extensions=[
-  ],
-  nested_types=[],
-  enum_types=[
-  ],
-  serialized_options=None,
-  is_extendable=False,
-  syntax='proto3',
-  extension_ranges=[],
-  oneofs=[
-  ],
-  serialized_start=141,
-  serialized_end=173,
-)
-
-
-_EMPTYPARAMS = _descriptor.Descriptor(
-  name='EmptyParams',
-  full_name='slm.EmptyParams',
-  filename=None,
-  file=DESCRIPTOR,
-  containing_type=None,
-  create_key=_descriptor._internal_create_key,
-  fields=[
-  ],
-  extensions=[
-  ],
-  nested_types=[],
-  enum_types=[
-  ],
-  serialized_options=None,
-  is_extendable=False,
-  syntax='proto3',
-  extension_ranges=[],
-  oneofs=[
-  ],
-  serialized_start=175,
-  serialized_end=188,
-)
-
-
-_RESPONSE = _descriptor.Descriptor(
-  name='Response',
-  full_name='slm.Response',
-  filename=None,
-  file=DESCRIPTOR,
-  containing_type=None,
-  create_key=_descriptor._internal_create_key,
-  fields=[
-    _descriptor.FieldDescriptor(
-      name='completed', full_name='slm.Response.completed', index=0,
-      number=8, type=8, cpp_type=7, label=1,
-      has_default_value=False, default_value=False,
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
-    _descriptor.FieldDescriptor(
-      name='error', full_name='slm.Response.error', index=1,
-      number=9, type=9, cpp_type=9, label=1,
-      has_default_value=False, default_value=b"".decode('utf-8'),
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
-  ],
-  extensions=[
-  ],
-  nested_types=[],
-  enum_types=[
-  ],
-  serialized_options=None,
-  is_extendable=False,
-  syntax='proto3',
-  extension_ranges=[],
-  oneofs=[
-  ],
-  serialized_start=190,
-  serialized_end=234,
-)
-
-DESCRIPTOR.message_types_by_name['Image'] = _IMAGE
-DESCRIPTOR.message_types_by_name['ScreenReply'] = _SCREENREPLY
-DESCRIPTOR.message_types_by_name['Screen'] = _SCREEN
-DESCRIPTOR.message_types_by_name['Position'] = _POSITION
-DESCRIPTOR.message_types_by_name['EmptyParams'] = _EMPTYPARAMS
-DESCRIPTOR.message_types_by_name['Response'] = _RESPONSE
-_sym_db.RegisterFileDescriptor(DESCRIPTOR)
-
-Image = _reflection.GeneratedProtocolMessageType('Image', (_message.Message,), {
-  'DESCRIPTOR' : _IMAGE,
-  '__module__' : 'slm_pb2'
-  # @@protoc_insertion_point(class_scope:slm.Image)
-  })
-_sym_db.RegisterMessage(Image)
-
-ScreenReply = _reflection.GeneratedProtocolMessageType('ScreenReply', (_message.Message,), {
-  'DESCRIPTOR' : _SCREENREPLY,
-  '__module__' : 'slm_pb2'
-  # @@protoc_insertion_point(class_scope:slm.ScreenReply)
-  })
-_sym_db.RegisterMessage(ScreenReply)
-
-Screen = _reflection.GeneratedProtocolMessageType('Screen', (_message.Message,), {
-  'DESCRIPTOR' : _SCREEN,
-  '__module__' : 'slm_pb2'
-  # @@protoc_insertion_point(class_scope:slm.Screen)
-  })
-_sym_db.RegisterMessage(Screen)
-
-Position = _reflection.GeneratedProtocolMessageType('Position', (_message.Message,), {
-  'DESCRIPTOR' : _POSITION,
-  '__module__' : 'slm_pb2'
-  # @@protoc_insertion_point(class_scope:slm.Position)
-  })
-_sym_db.RegisterMessage(Position)
-
-EmptyParams = _reflection.GeneratedProtocolMessageType('EmptyParams', (_message.Message,), {
-  'DESCRIPTOR' : _EMPTYPARAMS,
-  '__module__' : 'slm_pb2'
-  # @@protoc_insertion_point(class_scope:slm.EmptyParams)
-  })
-_sym_db.RegisterMessage(EmptyParams)
-
-Response = _reflection.GeneratedProtocolMessageType('Response', (_message.Message,), {
-  'DESCRIPTOR' : _RESPONSE,
-  '__module__' : 'slm_pb2'
-  # @@protoc_insertion_point(class_scope:slm.Response)
-  })
-_sym_db.RegisterMessage(Response)
-
-
-
-_SLM = _descriptor.ServiceDescriptor(
-  name='SLM',
-  full_name='slm.SLM',
-  file=DESCRIPTOR,
-  index=0,
-  serialized_options=None,
-  create_key=_descriptor._internal_create_key,
-  serialized_start=237,
-  serialized_end=422,
-  methods=[
-  _descriptor.MethodDescriptor(
-    name='SetImage',
-    full_name='slm.SLM.SetImage',
-    index=0,
-    containing_service=None,
-    input_type=_IMAGE,
-    output_type=_RESPONSE,
-    serialized_options=None,
-    create_key=_descriptor._internal_create_key,
-  ),
-  _descriptor.MethodDescriptor(
-    name='SetImageColour',
-    full_name='slm.SLM.SetImageColour',
-    index=1,
-    containing_service=None,
-    input_type=_IMAGE,
-    output_type=_RESPONSE,
-    serialized_options=None,
-    create_key=_descriptor._internal_create_key,
-  ),
-  _descriptor.MethodDescriptor(
-    name='SetScreen',
-    full_name='slm.SLM.SetScreen',
-    index=2,
-    containing_service=None,
-    input_type=_SCREEN,
-    output_type=_RESPONSE,
-    serialized_options=None,
-    create_key=_descriptor._internal_create_key,
-  ),
-  _descriptor.MethodDescriptor(
-    name='SetPosition',
-    full_name='slm.SLM.SetPosition',
-    index=3,
-    containing_service=None,
-    input_type=_POSITION,
-    output_type=_RESPONSE,
-    serialized_options=None,
-    create_key=_descriptor._internal_create_key,
-  ),
-])
-_sym_db.RegisterServiceDescriptor(_SLM)
-
-DESCRIPTOR.services_by_name['SLM'] = _SLM
-
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\tslm.proto\x12\x03slm\"\xfc\x01\n\x05Image\x12\x13\n\x0bimage_bytes\x18\x01 \x01(\x0c\x12\r\n\x05width\x18\x02 \x01(\x05\x12\x0e\n\x06height\x18\x03 \x01(\x05\x12\x0e\n\x06\x64igest\x18\n \x01(\x0c\x12\x1d\n\x07session\x18\x10 \x01(\x0b\x32\x0c.slm.Session\x12\x13\n\x0b\x62lock_scale\x18\x12 \x01(\x05\x12\x0c\n\x04tile\x18\x13 \x01(\x08\x12%\n\x0b\x63ompression\x18\x1e \x01(\x0e\x32\x10.slm.Compression\x12\x0f\n\x07strides\x18  \x03(\x03\x12\"\n\npixel_type\x18! \x01(\x0e\x32\x0e.slm.PixelType\x12\x11\n\tsubframes\x18\" \x01(\x05\"<\n\x0bImageDigest\x12\x0e\n\x06\x64igest\x18\x0b \x01(\x0c\x12\x1d\n\x07session\x18\x11 \x01(\x0b\x32\x0c.slm.Session\"@\n\x07Session\x12\x11\n\tclient_id\x18\r \x01(\t\x12\x10\n\x08sequence\x18\x0e \x01(\x04\x12\x10\n\x08priority\x18\x0f \x01(\x05\"(\n\nCacheReply\x12\x0b\n\x03hit\x18\x0c \x01(\x08\x12\r\n\x05\x65rror\x18. \x01(\t\"\x89\x01\n\x0bScreenReply\x12\x13\n\x0bnum_screens\x18\x04 \x01(\x05\x12 \n\x07screens\x18\x1b \x03(\x0b\x32\x0f.slm.ScreenInfo\x12\x15\n\ractive_screen\x18\x1c \x01(\x05\x12,\n\x12\x63ompression_codecs\x18\x1f \x03(\x0e\x32\x10.slm.Compression\"t\n\nScreenInfo\x12\r\n\x05index\x18\x14 \x01(\x05\x12\x0c\n\x04name\x18\x15 \x01(\t\x12\t\n\x01x\x18\x16 \x01(\x05\x12\t\n\x01y\x18\x17 \x01(\x05\x12\r\n\x05width\x18\x18 \x01(\x05\x12\x0e\n\x06height\x18\x19 \x01(\x05\x12\x14\n\x0crefresh_rate\x18\x1a \x01(\x01\"\x18\n\x06Screen\x12\x0e\n\x06screen\x18\x05 \x01(\x05\" \n\x08Position\x12\t\n\x01x\x18\x06 \x01(\x05\x12\t\n\x01y\x18\x07 \x01(\x05\"\r\n\x0b\x45mptyParams\"\x1c\n\x05Trace\x12\x13\n\x0b\x65vents_json\x18\x1d \x01(\t\"\xa7\x01\n\x10\x43\x61librationSweep\x12\"\n\x07pattern\x18# \x01(\x0e\x32\x11.slm.SweepPattern\x12\x0e\n\x06levels\x18$ \x03(\x05\x12\x17\n\x0f\x64well_refreshes\x18% \x01(\x05\x12\x17\n\x0freference_level\x18& \x01(\x05\x12\x0e\n\x06period\x18\' \x01(\x05\x12\x1d\n\x07session\x18( \x01(\x0b\x32\x0c.slm.Session\"_\n\nSweepEvent\x12\r\n\x05index\x18) \x01(\x05\x12\r\n\x05level\x18* \x01(\x05\x12\x10\n\x08shown_ns\x18+ \x01(\x03\x12\x12\n\npainted_ns\x18, \x01(\x03\x12\r\n\x05\x65rror\x18- \x01(\t\",\n\x08Response\x12\x11\n\tcompleted\x18\x08 \x01(\x08\x12\r\n\x05\x65rror\x18\t \x01(\t*/\n\tPixelType\x12\t\n\x05UINT8\x10\x00\x12\n\n\x06UINT16\x10\x01\x12\x0b\n\x07\x46LOAT32\x10\x02*>\n\x0b\x43ompression\x12\x12\n\x0eNO_COMPRESSION\x10\x00\x12\x08\n\x04ZLIB\x10\x01\x12\x08\n\x04LZMA\x10\x02\x12\x07\n\x03\x42Z2\x10\x03*>\n\x0cSweepPattern\x12\x0b\n\x07UNIFORM\x10\x00\x12\x10\n\x0cSPLIT_SCREEN\x10\x01\x12\x0f\n\x0bPHASE_STEPS\x10\x02\x32\x99\x04\n\x03SLM\x12\'\n\x08SetImage\x12\n.slm.Image\x1a\r.slm.Response\"\x00\x12\x35\n\x0eSetCachedImage\x12\x10.slm.ImageDigest\x1a\x0f.slm.CacheReply\"\x00\x12/\n\x0eSetImageColour\x12\n.slm.Image\x1a\r.slm.Response\"\x00(\x01\x12)\n\tSetScreen\x12\x0b.slm.Screen\x1a\r.slm.Response\"\x00\x12-\n\x0bSetPosition\x12\r.slm.Position\x1a\r.slm.Response\"\x00\x12)\n\nStageImage\x12\n.slm.Image\x1a\r.slm.Response\"\x00\x12)\n\x04Swap\x12\x10.slm.EmptyParams\x1a\r.slm.Response\"\x00\x12\x36\n\x0eGetDisplayInfo\x12\x10.slm.EmptyParams\x1a\x10.slm.ScreenReply\"\x00\x12*\n\x08GetTrace\x12\x10.slm.EmptyParams\x1a\n.slm.Trace\"\x00\x12*\n\x08GetFrame\x12\x10.slm.EmptyParams\x1a\n.slm.Image\"\x00\x12\x41\n\x13RunCalibrationSweep\x12\x15.slm.CalibrationSweep\x1a\x0f.slm.SweepEvent\"\x00\x30\x01\x62\x06proto3')
+
+_globals = globals()
+_builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
+_builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'slm_pb2', _globals)
+if _descriptor._USE_C_DESCRIPTORS == False:
+  DESCRIPTOR._options = None
+  _globals['_PIXELTYPE']._serialized_start=1119
+  _globals['_PIXELTYPE']._serialized_end=1166
+  _globals['_COMPRESSION']._serialized_start=1168
+  _globals['_COMPRESSION']._serialized_end=1230
+  _globals['_SWEEPPATTERN']._serialized_start=1232
+  _globals['_SWEEPPATTERN']._serialized_end=1294
+  _globals['_IMAGE']._serialized_start=19
+  _globals['_IMAGE']._serialized_end=271
+  _globals['_IMAGEDIGEST']._serialized_start=273
+  _globals['_IMAGEDIGEST']._serialized_end=333
+  _globals['_SESSION']._serialized_start=335
+  _globals['_SESSION']._serialized_end=399
+  _globals['_CACHEREPLY']._serialized_start=401
+  _globals['_CACHEREPLY']._serialized_end=441
+  _globals['_SCREENREPLY']._serialized_start=444
+  _globals['_SCREENREPLY']._serialized_end=581
+  _globals['_SCREENINFO']._serialized_start=583
+  _globals['_SCREENINFO']._serialized_end=699
+  _globals['_SCREEN']._serialized_start=701
+  _globals['_SCREEN']._serialized_end=725
+  _globals['_POSITION']._serialized_start=727
+  _globals['_POSITION']._serialized_end=759
+  _globals['_EMPTYPARAMS']._serialized_start=761
+  _globals['_EMPTYPARAMS']._serialized_end=774
+  _globals['_TRACE']._serialized_start=776
+  _globals['_TRACE']._serialized_end=804
+  _globals['_CALIBRATIONSWEEP']._serialized_start=807
+  _globals['_CALIBRATIONSWEEP']._serialized_end=974
+  _globals['_SWEEPEVENT']._serialized_start=976
+  _globals['_SWEEPEVENT']._serialized_end=1071
+  _globals['_RESPONSE']._serialized_start=1073
+  _globals['_RESPONSE']._serialized_end=1117
+  _globals['_SLM']._serialized_start=1297
+  _globals['_SLM']._serialized_end=1834
 # @@protoc_insertion_point(module_scope)
@@ -19,6 +19,11 @@ class SLMStub(object):
                 request_serializer=slm__pb2.Image.SerializeToString,
                 response_deserializer=slm__pb2.Response.FromString,
                 )
+        self.SetCachedImage = channel.unary_unary(
+                '/slm.SLM/SetCachedImage',
+                request_serializer=slm__pb2.ImageDigest.SerializeToString,
+                response_deserializer=slm__pb2.CacheReply.FromString,
+                )
         self.SetImageColour = channel.stream_unary(
                 '/slm.SLM/SetImageColour',
                 request_serializer=slm__pb2.Image.SerializeToString,
@@ -34,13 +39,51 @@ class SLMStub(object):
                 request_serializer=slm__pb2.Position.SerializeToString,
                 response_deserializer=slm__pb2.Response.FromString,
                 )
+        self.StageImage = channel.unary_unary(
+                '/slm.SLM/StageImage',
+                request_serializer=slm__pb2.Image.SerializeToString,
+                response_deserializer=slm__pb2.Response.FromString,
+                )
+        self.Swap = channel.unary_unary(
+                '/slm.SLM/Swap',
+                request_serializer=slm__pb2.EmptyParams.SerializeToString,
+                response_deserializer=slm__pb2.Response.FromString,
+                )
+        self.GetDisplayInfo = channel.unary_unary(
+                '/slm.SLM/GetDisplayInfo',
+                request_serializer=slm__pb2.EmptyParams.SerializeToString,
+                response_deserializer=slm__pb2.ScreenReply.FromString,
+                )
+        self.GetTrace = channel.unary_unary(
+                '/slm.SLM/GetTrace',
+                request_serializer=slm__pb2.EmptyParams.SerializeToString,
+                response_deserializer=slm__pb2.Trace.FromString,
+                )
+        self.GetFrame = channel.unary_unary(
+                '/slm.SLM/GetFrame',
+                request_serializer=slm__pb2.EmptyParams.SerializeToString,
+                response_deserializer=slm__pb2.Image.FromString,
+                )
+        self.RunCalibrationSweep = channel.unary_stream(
+                '/slm.SLM/RunCalibrationSweep',
+                request_serializer=slm__pb2.CalibrationSweep.SerializeToString,
+                response_deserializer=slm__pb2.SweepEvent.FromString,
+                )
 
 
 class SLMServicer(object):
     """Missing associated documentation comment in .proto file."""
 
     def SetImage(self, request, context):
-        """Set the image from a uint8 numpy bytes array and a width and height
+        """Set the image from a numpy bytes array, its width and height, and its strides
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def SetCachedImage(self, request, context):
+        """Set the image from one previously sent with a digest, without resending the bytes
+        Returns hit=false if the server no longer holds the image
         """
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
         context.set_details('Method not implemented!')
@@ -68,6 +111,50 @@ class SLMServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def StageImage(self, request, context):
+        """Upload an image and convert it into the back buffer, without displaying it
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def Swap(self, request, context):
+        """Swap the back buffer onto the screen, the previous image becomes the back buffer
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetDisplayInfo(self, request, context):
+        """Get the screens available, their geometry and refresh rates, and the screen in use
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetTrace(self, request, context):
+        """Get the trace events the server has recorded for traced frames
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetFrame(self, request, context):
+        """Get what the slm screen shows, as a uint8 image the size of the screen,
+        rendered exactly as the display paints it
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def RunCalibrationSweep(self, request, context):
+        """Step through calibration frames generated on the server, each for a fixed
+        number of screen refreshes, streaming back when each one was shown
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_SLMServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -76,6 +163,11 @@ def add_SLMServicer_to_server(servicer, server):
                     request_deserializer=slm__pb2.Image.FromString,
                     response_serializer=slm__pb2.Response.SerializeToString,
             ),
+            'SetCachedImage': grpc.unary_unary_rpc_method_handler(
+                    servicer.SetCachedImage,
+                    request_deserializer=slm__pb2.ImageDigest.FromString,
+                    response_serializer=slm__pb2.CacheReply.SerializeToString,
+            ),
             'SetImageColour': grpc.stream_unary_rpc_method_handler(
                     servicer.SetImageColour,
                     request_deserializer=slm__pb2.Image.FromString,
@@ -91,6 +183,36 @@ def add_SLMServicer_to_server(servicer, server):
                     request_deserializer=slm__pb2.Position.FromString,
                     response_serializer=slm__pb2.Response.SerializeToString,
             ),
+            'StageImage': grpc.unary_unary_rpc_method_handler(
+                    servicer.StageImage,
+                    request_deserializer=slm__pb2.Image.FromString,
+                    response_serializer=slm__pb2.Response.SerializeToString,
+            ),
+            'Swap': grpc.unary_unary_rpc_method_handler(
+                    servicer.Swap,
+                    request_deserializer=slm__pb2.EmptyParams.FromString,
+                    response_serializer=slm__pb2.Response.SerializeToString,
+            ),
+            'GetDisplayInfo': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetDisplayInfo,
+                    request_deserializer=slm__pb2.EmptyParams.FromString,
+                    response_serializer=slm__pb2.ScreenReply.SerializeToString,
+            ),
+            'GetTrace': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetTrace,
+                    request_deserializer=slm__pb2.EmptyParams.FromString,
+                    response_serializer=slm__pb2.Trace.SerializeToString,
+            ),
+            'GetFrame': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetFrame,
+                    request_deserializer=slm__pb2.EmptyParams.FromString,
+                    response_serializer=slm__pb2.Image.SerializeToString,
+            ),
+            'RunCalibrationSweep': grpc.unary_stream_rpc_method_handler(
+                    servicer.RunCalibrationSweep,
+                    request_deserializer=slm__pb2.CalibrationSweep.FromString,
+                    response_serializer=slm__pb2.SweepEvent.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'slm.SLM', rpc_method_handlers)
@@ -118,6 +240,23 @@ class SLM(object):
             options, channel_credentials,
             insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
 
+    @staticmethod
+    def SetCachedImage(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/slm.SLM/SetCachedImage',
+            slm__pb2.ImageDigest.SerializeToString,
+            slm__pb2.CacheReply.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
     @staticmethod
     def SetImageColour(request_iterator,
             target,
@@ -168,3 +307,105 @@ class SLM(object):
             slm__pb2.Response.FromString,
             options, channel_credentials,
             insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def StageImage(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/slm.SLM/StageImage',
+            slm__pb2.Image.SerializeToString,
+            slm__pb2.Response.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def Swap(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/slm.SLM/Swap',
+            slm__pb2.EmptyParams.SerializeToString,
+            slm__pb2.Response.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def GetDisplayInfo(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/slm.SLM/GetDisplayInfo',
+            slm__pb2.EmptyParams.SerializeToString,
+            slm__pb2.ScreenReply.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def GetTrace(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/slm.SLM/GetTrace',
+            slm__pb2.EmptyParams.SerializeToString,
+            slm__pb2.Trace.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def GetFrame(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/slm.SLM/GetFrame',
+            slm__pb2.EmptyParams.SerializeToString,
+            slm__pb2.Image.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def RunCalibrationSweep(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(request, target, '/slm.SLM/RunCalibrationSweep',
+            slm__pb2.CalibrationSweep.SerializeToString,
+            slm__pb2.SweepEvent.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
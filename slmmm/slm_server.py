@@ -3,17 +3,31 @@ import PyQt5.QtCore as qc
 import PyQt5.QtGui as qg
 import numpy as np
 
+import asyncio
+import functools
+import json
+import math
+import time
 import grpc
 from concurrent import futures
+from PyQt5 import sip
 
 from slmmm import slm_pb2
 from slmmm import slm_pb2_grpc
+from slmmm.calibration import Sweep
+from slmmm.compression import CODECS, decompress
+from slmmm.dither import DEFAULT_SUBFRAMES, dither
+from slmmm.expand import expand_blocks, tile
+from slmmm.frame_cache import FrameCache
+from slmmm.frames import MESSAGE_OPTIONS, PIXEL_DTYPES, deserialise, frame_span, line_layout
+from slmmm.sessions import FrameSequencer
+from slmmm.tracing import trace_id_from, tracer
 
 
 def serve(worker, port) -> None:
     """Start a grpc server on the given port
     """
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10), options=MESSAGE_OPTIONS)
     slm_pb2_grpc.add_SLMServicer_to_server(SLM(worker), server)
     listen_addr = f'[::]:{port}'
     server.add_insecure_port(listen_addr)
@@ -21,29 +35,165 @@ def serve(worker, port) -> None:
     server.wait_for_termination()
 
 
+async def serve_async(worker, port, max_concurrent_rpcs=100) -> None:
+    """Start a grpc asyncio server on the given port, running on the current event loop
+    Requests above max_concurrent_rpcs are rejected with RESOURCE_EXHAUSTED
+    """
+    server = grpc.aio.server(maximum_concurrent_rpcs=max_concurrent_rpcs,
+                             options=MESSAGE_OPTIONS)
+    slm_pb2_grpc.add_SLMServicer_to_server(AsyncSLM(worker), server)
+    listen_addr = f'[::]:{port}'
+    server.add_insecure_port(listen_addr)
+    await server.start()
+    await server.wait_for_termination()
+
+
+def reports_errors(slot):
+    """Make a display slot print any exception rather than raise it, as an
+    exception escaping a slot aborts the whole application
+    """
+    @functools.wraps(slot)
+    def wrapper(*args):
+        try:
+            return slot(*args)
+        except Exception as e:
+            print(f"{slot.__name__} failed: {e!r}")
+    return wrapper
+
+
+def decode_image(request):
+    """Get the image in an Image request as an array of shape (height, width),
+    viewing the received bytes with the strides and pixel type it was sent with
+    """
+    if request.pixel_type not in PIXEL_DTYPES:
+        raise ValueError(f"Unknown pixel type {request.pixel_type}")
+    dtype = PIXEL_DTYPES[request.pixel_type]
+    # a payload is never allowed to decompress to more than its frame needs
+    size = frame_span(request.height, request.width, request.strides, dtype)
+    image_bytes = decompress(request.image_bytes, request.compression, size)
+    return deserialise(image_bytes, request.height, request.width, request.strides, dtype)
+
+
+def frame_reply(frame):
+    """Get an Image holding a 2d uint8 array
+    """
+    return slm_pb2.Image(image_bytes=frame.tobytes(), width=frame.shape[1],
+                         height=frame.shape[0])
+
+
+# maps (x, y) to (y, x), to show the transpose of an image
+TRANSPOSE = qg.QTransform(0, 1, 1, 0, 0, 0)
+
+
+def grey_qimage(image):
+    """Wrap a 2d uint8 array in a greyscale QImage without copying it, giving the
+    QImage explicit bytes per line so padded and unaligned rows show correctly.
+    Returns the QImage, and whether it holds the transpose of the array, which
+    is the case for arrays with contiguous columns (such as Fortran ordered ones).
+    The array must have contiguous rows or columns, and outlive the QImage
+    """
+    line_bytes, transposed = line_layout(image)
+    height, width = image.shape[::-1] if transposed else image.shape
+    qimage = qg.QImage(sip.voidptr(image.ctypes.data), width, height, line_bytes,
+                       qg.QImage.Format_Grayscale8)
+    return qimage, transposed
+
+
 class SLM(slm_pb2_grpc.SLMServicer):
-    def __init__(self, worker):
+    def __init__(self, worker, cache=None, sequencer=None):
         self.worker = worker
+        self.cache = FrameCache() if cache is None else cache
+        self.sequencer = FrameSequencer() if sequencer is None else sequencer
+
+    def show(self, ticket, session, signal, *args, trace_id=0):
+        """Emit the args on the signal if the sequencer accepts the frame
+        Returns the error if the frame was rejected, otherwise None
+        """
+        def emit():
+            tracer.begin("signal hop", trace_id)
+            signal.emit(*args)
+        return self.sequencer.submit(ticket, session, emit)
 
     def SetImage(self, request, context):
+        return self.handle_image(self.sequencer.ticket(), request, context)
+
+    def handle_image(self, ticket, request, context):
+        """Decode, check and show an Image request, given the sequencer ticket
+        it was given when it arrived
+        """
         try:
-            new_image = np.frombuffer(request.image_bytes, dtype=np.uint8).reshape(
-                (request.height, request.width))
-            self.worker.set_image.emit(new_image)
+            trace_id = trace_id_from(context)
+            with tracer.span("SLM.SetImage", trace_id, nbytes=len(request.image_bytes)):
+                with tracer.span("decode", trace_id):
+                    new_image = decode_image(request)
+                if new_image.size == 0:
+                    return slm_pb2.Response(completed=False, error="The image is empty")
+                if request.block_scale < 0:
+                    return slm_pb2.Response(completed=False,
+                                            error="The block scale should be positive")
+                if new_image.dtype != np.uint8 and (request.tile or request.block_scale > 1):
+                    return slm_pb2.Response(completed=False,
+                                            error="Only uint8 images can be scaled or tiled")
+                if new_image.dtype != np.uint8:
+                    # the sub-frames are made once here, and cached in place of the image
+                    with tracer.span("dither", trace_id):
+                        subframes = dither(new_image, request.subframes or DEFAULT_SUBFRAMES)
+                    if request.digest:
+                        self.cache.put(request.digest, subframes)
+                    error = self.show(ticket, request.session, self.worker.set_image_dithered,
+                                      subframes, trace_id, trace_id=trace_id)
+                elif request.tile:
+                    error = self.show(ticket, request.session, self.worker.set_image_tiled,
+                                      new_image, trace_id, trace_id=trace_id)
+                elif request.block_scale > 1:
+                    error = self.show(ticket, request.session, self.worker.set_image_blocks,
+                                      new_image, request.block_scale, trace_id,
+                                      trace_id=trace_id)
+                else:
+                    if request.digest:
+                        self.cache.put(request.digest, new_image)
+                    error = self.show(ticket, request.session, self.worker.set_image,
+                                      new_image, trace_id, trace_id=trace_id)
+            if error is not None:
+                return slm_pb2.Response(completed=False, error=error)
             return slm_pb2.Response(completed=True)
         except ValueError:
             return slm_pb2.Response(completed=False, error="Couldn't set the image")
 
+    def SetCachedImage(self, request, context):
+        ticket = self.sequencer.ticket()
+        trace_id = trace_id_from(context)
+        with tracer.span("SLM.SetCachedImage", trace_id):
+            cached_image = self.cache.get(request.digest)
+            if cached_image is None:
+                return slm_pb2.CacheReply(hit=False)
+            # a rejected frame still counts as a hit, there's no point re-sending it
+            signal = self.worker.set_image_dithered if cached_image.ndim == 3 \
+                else self.worker.set_image
+            error = self.show(ticket, request.session, signal, cached_image, trace_id,
+                              trace_id=trace_id)
+            return slm_pb2.CacheReply(hit=True, error=error)
+
     def SetImageColour(self, request_iterator, context):
+        requests = list(request_iterator)
+        # like the unary calls, the frame arrives once all of it has been received
+        return self.handle_image_colour(self.sequencer.ticket(), requests)
+
+    def handle_image_colour(self, ticket, requests):
+        """Decode, check and show the channels of a colour image, given the
+        sequencer ticket it was given when it arrived
+        """
         try:
-            image_bytes = []
-            for request in request_iterator:
-                image_bytes.append(np.frombuffer(request.image_bytes, dtype=np.uint8).reshape(
-                    request.height, request.width))
-            assert len(image_bytes) == 3, "Image should have 3 channels"
-
-            self.worker.set_image_colour.emit(
-                np.transpose(np.array(image_bytes), axes=(1, 2, 0)).copy())
+            channels = [decode_image(request) for request in requests]
+            assert len(channels) == 3, "Image should have 3 channels"
+            if any(channel.dtype != np.uint8 for channel in channels):
+                return slm_pb2.Response(completed=False,
+                                        error="Only uint8 images can be shown in colour")
+
+            error = self.show(ticket, requests[0].session, self.worker.set_image_colour,
+                              np.stack(channels, axis=2))
+            if error is not None:
+                return slm_pb2.Response(completed=False, error=error)
             return slm_pb2.Response(completed=True)
         except ValueError:
             return slm_pb2.Response(completed=False, error="Couldn't set the image")
@@ -58,26 +208,250 @@ class SLM(slm_pb2_grpc.SLMServicer):
         self.worker.set_position.emit(request.x, request.y)
         return slm_pb2.Response(completed=True)
 
+    def StageImage(self, request, context):
+        try:
+            new_image = decode_image(request)
+            if new_image.dtype != np.uint8:
+                return slm_pb2.Response(completed=False, error="Only uint8 images can be staged")
+            if request.digest:
+                self.cache.put(request.digest, new_image)
+            self.worker.stage_image.emit(new_image)
+            return slm_pb2.Response(completed=True)
+        except ValueError:
+            return slm_pb2.Response(completed=False, error="Couldn't stage the image")
+
+    def Swap(self, request, context):
+        self.worker.swap.emit()
+        return slm_pb2.Response(completed=True)
+
+    def GetDisplayInfo(self, request, context):
+        # the display replaces this whenever the screens change, so it's always
+        # a complete snapshot
+        return self.worker.display_info
+
+    def GetTrace(self, request, context):
+        return slm_pb2.Trace(events_json=json.dumps(tracer.chrome_events()))
+
+    def request_frame(self):
+        '''Ask the display for the frame it's showing, returning a future of it
+        '''
+        future = futures.Future()
+        self.worker.capture.emit(future)
+        return future
+
+    def GetFrame(self, request, context):
+        return frame_reply(self.request_frame().result())
+
+    def start_sweep(self, request):
+        '''Start a calibration sweep on the display, if the request is valid and
+        the sequencer accepts it. Returns the sweep, which yields its events
+        '''
+        try:
+            sweep = Sweep.from_request(request)
+        except ValueError as e:
+            return Sweep.failed(str(e))
+        error = self.show(self.sequencer.ticket(), request.session, self.worker.run_sweep, sweep)
+        if error is not None:
+            return Sweep.failed(error)
+        return sweep
+
+    def RunCalibrationSweep(self, request, context):
+        sweep = self.start_sweep(request)
+        # stop the sweep if the client goes away
+        context.add_callback(sweep.cancel)
+        yield from sweep
+
+
+class AsyncSLM(SLM):
+    """The SLM service for a grpc asyncio server.
+    Handlers run the same code as SLM. Decoding a frame (decompressing it, and
+    dithering uint16 and float images) can take tens of ms, so frames are
+    decoded in the event loop's default executor, after taking their sequencer
+    ticket on the loop as they arrive. Everything else runs on the loop.
+    """
+
+    async def SetImage(self, request, context):
+        return await asyncio.get_running_loop().run_in_executor(
+            None, self.handle_image, self.sequencer.ticket(), request, context)
+
+    async def SetCachedImage(self, request, context):
+        return SLM.SetCachedImage(self, request, context)
+
+    async def SetImageColour(self, request_iterator, context):
+        requests = [request async for request in request_iterator]
+        return await asyncio.get_running_loop().run_in_executor(
+            None, self.handle_image_colour, self.sequencer.ticket(), requests)
+
+    async def SetScreen(self, request, context):
+        return SLM.SetScreen(self, request, context)
+
+    async def SetPosition(self, request, context):
+        return SLM.SetPosition(self, request, context)
+
+    async def StageImage(self, request, context):
+        return await asyncio.get_running_loop().run_in_executor(
+            None, SLM.StageImage, self, request, context)
+
+    async def Swap(self, request, context):
+        return SLM.Swap(self, request, context)
+
+    async def GetDisplayInfo(self, request, context):
+        return SLM.GetDisplayInfo(self, request, context)
+
+    async def GetTrace(self, request, context):
+        return SLM.GetTrace(self, request, context)
+
+    async def GetFrame(self, request, context):
+        return frame_reply(await asyncio.wrap_future(self.request_frame()))
+
+    async def RunCalibrationSweep(self, request, context):
+        sweep = self.start_sweep(request)
+        context.add_done_callback(lambda _: sweep.cancel())
+        loop = asyncio.get_running_loop()
+        while True:
+            # the events are waited for off the event loop
+            event = await loop.run_in_executor(None, sweep.events.get)
+            if event is None:
+                return
+            yield event
+
 
 class SLMWorker(qc.QObject):
     """A worker to interact with the grpc server.
     This gets placed in a different thread to the main thread and communicates
     with the display through qsignals.
+    If use_asyncio is True, the server is a grpc asyncio server running its own
+    event loop in the worker's thread, rather than a thread pool server.
     """
     start = qc.pyqtSignal()
-    set_image = qc.pyqtSignal(np.ndarray)
+    # frame signals carry the frame's trace id last, 0 if it isn't traced
+    set_image = qc.pyqtSignal(np.ndarray, 'qint64')
     set_image_colour = qc.pyqtSignal(np.ndarray)
     set_screen = qc.pyqtSignal(int)
     set_position = qc.pyqtSignal(int, int)
-
-    def __init__(self, port, *args, **kwargs):
+    stage_image = qc.pyqtSignal(np.ndarray)
+    swap = qc.pyqtSignal()
+    set_image_blocks = qc.pyqtSignal(np.ndarray, int, 'qint64')
+    set_image_tiled = qc.pyqtSignal(np.ndarray, 'qint64')
+    set_image_dithered = qc.pyqtSignal(np.ndarray, 'qint64')
+    # carries a concurrent.futures.Future to set to the frame on screen
+    capture = qc.pyqtSignal(object)
+    run_sweep = qc.pyqtSignal(object)
+
+    def __init__(self, port, *args, use_asyncio=False, **kwargs):
         super().__init__()
         self.start.connect(self.run)
         self.port = port
+        self.use_asyncio = use_asyncio
+        self.display_info = slm_pb2.ScreenReply()
 
     @qc.pyqtSlot()
     def run(self):
-        serve(self, self.port)
+        if self.use_asyncio:
+            asyncio.run(serve_async(self, self.port))
+        else:
+            serve(self, self.port)
+
+
+class SLMView(qw.QGraphicsView):
+    """The fullscreen view of the slm, which traces painting traced frames
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.trace_id = 0
+        # when the view was first painted since this was last set to 0, in
+        # wall clock nanoseconds
+        self.first_painted_ns = 0
+
+    def paintEvent(self, event):
+        with tracer.span("paint", self.trace_id):
+            super().paintEvent(event)
+        self.trace_id = 0
+        if not self.first_painted_ns:
+            self.first_painted_ns = time.time_ns()
+
+
+def opengl_available():
+    """Whether OpenGL contexts can be made, which they can't on the offscreen platform
+    """
+    return qg.QOpenGLContext().create()
+
+
+class RefreshClock(qc.QObject):
+    """Counts the refreshes of the screen from when it's started, emitting
+    refreshed with the count at each one.
+    With an OpenGL viewport (see set_viewport) the view is repainted for every
+    refresh, and each buffer swap, which waits for vsync, is a refresh.
+    Otherwise a precise timer wakes at each refresh time, worked out from the
+    start so it doesn't drift, and the count is the number of refresh periods
+    passed, so a late wake skips ahead rather than putting frames out of step
+    """
+    refreshed = qc.pyqtSignal(int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.running = False
+        self.count = 0
+        self.period = 1 / 60
+        self.start_time = 0.0
+        self.viewport = None
+        self.timer = qc.QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setTimerType(qc.Qt.PreciseTimer)
+        self.timer.timeout.connect(self.tick)
+
+    def set_viewport(self, viewport):
+        """Count the buffer swaps of the viewport if it's an OpenGL widget,
+        otherwise time the refreshes
+        """
+        if self.viewport is not None:
+            self.viewport.frameSwapped.disconnect(self.swapped)
+        self.viewport = None
+        if isinstance(viewport, qw.QOpenGLWidget):
+            self.viewport = viewport
+            viewport.frameSwapped.connect(self.swapped)
+        if self.running:
+            self.start(self.period)
+
+    def start(self, period):
+        """Start counting from 0, given the time between refreshes in s
+        """
+        self.running = True
+        self.count = 0
+        self.period = period
+        self.start_time = time.perf_counter()
+        self.timer.stop()
+        if self.viewport is not None:
+            self.viewport.update()
+        else:
+            self.schedule()
+
+    def stop(self):
+        self.running = False
+        self.timer.stop()
+
+    @qc.pyqtSlot()
+    def swapped(self):
+        if not self.running:
+            return
+        self.count += 1
+        self.refreshed.emit(self.count)
+        if self.running:
+            self.viewport.update()
+
+    def schedule(self):
+        wake = self.start_time + (self.count + 1) * self.period
+        self.timer.start(max(0, math.ceil(1000 * (wake - time.perf_counter()))))
+
+    @qc.pyqtSlot()
+    def tick(self):
+        count = int((time.perf_counter() - self.start_time) / self.period)
+        if count > self.count:
+            self.count = count
+            self.refreshed.emit(count)
+        if self.running:
+            self.schedule()
 
 
 class SLMDisplay(qc.QObject):
@@ -89,28 +463,69 @@ class SLMDisplay(qc.QObject):
                  application,
                  port,
                  slm_display_size=None,
-                 slm_position=(0, 0)):
+                 slm_position=(0, 0),
+                 use_asyncio=False):
         super().__init__()
 
         self.app = application
 
-        self.thread = qc.QThread()
-        self.thread.start()
-
-        self.worker = SLMWorker(port)
-        self.worker.set_image.connect(self.set_image)
-        self.worker.set_image_colour.connect(self.set_image_colour)
-        self.worker.set_position.connect(self.set_position)
-        self.worker.set_screen.connect(self.set_screen)
-
-        self.worker.moveToThread(self.thread)
-        self.worker.start.emit()
+        # with no port there's no grpc server, and the display is driven directly
+        self.thread = None
+        self.worker = None
+        if port is not None:
+            self.thread = qc.QThread()
+            self.thread.start()
+
+            self.worker = SLMWorker(port, use_asyncio=use_asyncio)
+            self.worker.set_image.connect(self.set_image)
+            self.worker.set_image_colour.connect(self.set_image_colour)
+            self.worker.set_position.connect(self.set_position)
+            self.worker.set_screen.connect(self.set_screen)
+            self.worker.stage_image.connect(self.stage_image)
+            self.worker.swap.connect(self.swap)
+            self.worker.set_image_blocks.connect(self.set_image_blocks)
+            self.worker.set_image_tiled.connect(self.set_image_tiled)
+            self.worker.set_image_dithered.connect(self.set_image_dithered)
+            self.worker.capture.connect(self.capture_to)
+            self.worker.run_sweep.connect(self.run_sweep)
+
+            self.worker.moveToThread(self.thread)
+            self.worker.start.emit()
 
         self.image_ref = None
+        # the pixmap on screen, and the pre-converted pixmap waiting to be swapped on
+        self.front_buffer = None
+        self.back_buffer = None
+        # whether each of those pixmaps holds the transpose of its image
+        self.front_transposed = False
+        self.back_transposed = False
+        # a screen sized buffer which expanded images are written into
+        self.frame_buffer = None
+        # counts the screen's refreshes while a dithered image or a sweep is
+        # shown. Where
+        # OpenGL works the view paints through an OpenGL viewport, so the count
+        # is paced by vsync
+        self.use_opengl = opengl_available()
+        self.refresh_clock = RefreshClock(self)
+        self.refresh_clock.refreshed.connect(self.refreshed)
+        # the pixmaps of the dithered image being cycled through, one per refresh
+        self.subframes = []
+        # the calibration sweep being shown, the buffer its frames are made in,
+        # the pixmap of its next frame, and the refresh count its frame on the
+        # screen was shown at. Frames are changed by the refresh clock
+        self.sweep = None
+        self.sweep_index = 0
+        self.sweep_buffer = None
+        self.sweep_pixmap = None
+        self.sweep_shown_count = 0
 
         self.scene = qw.QGraphicsScene()
 
         self.screen = None
+        self.screen_index = 0
+        self.display_info = slm_pb2.ScreenReply()
+        self.app.screenAdded.connect(self.update_display_info)
+        self.app.screenRemoved.connect(self.update_display_info)
 
         # this turns off any annoying border the window might have
         self.set_screen(0)
@@ -120,6 +535,7 @@ class SLMDisplay(qc.QObject):
         pass
 
     @qc.pyqtSlot(int)
+    @reports_errors
     def set_screen(self, screen_index):
         """Set the screen the plot is to be displayed on
         destroys the current window, and creates a new one with the same values
@@ -127,14 +543,19 @@ class SLMDisplay(qc.QObject):
         screens = self.app.screens()
         if len(screens) <= screen_index:
             print("No screen at that index, setting to last screen")
-            new_screen = screens[-1]
-        else:
-            new_screen = screens[screen_index]
+            screen_index = len(screens) - 1
+        new_screen = screens[screen_index]
+        self.screen_index = screen_index
         shape = (new_screen.geometry().width(),
                  new_screen.geometry().height())
+        if self.frame_buffer is None or self.frame_buffer.shape != shape[::-1]:
+            self.frame_buffer = np.zeros(shape[::-1], dtype=np.uint8)
         if self.screen is not None:
             self.screen.close()
-        self.screen = qw.QGraphicsView()
+        self.screen = SLMView()
+        if self.use_opengl:
+            self.screen.setViewport(qw.QOpenGLWidget())
+        self.refresh_clock.set_viewport(self.screen.viewport())
         self.scene.setSceneRect(0, 0, *shape)
         self.screen.setStyleSheet("border: 0px")
         self.screen.setScene(self.scene)
@@ -144,27 +565,243 @@ class SLMDisplay(qc.QObject):
         self.screen.windowHandle().setScreen(new_screen)
         self.screen.showFullScreen()
         self.screen.setWindowTitle("SLM")
+        self.update_display_info()
 
-    @qc.pyqtSlot(np.ndarray)
-    def set_image(self, image):
+    @qc.pyqtSlot()
+    def update_display_info(self):
+        '''Cache the list of screens, and which one is in use, for clients to ask for
+        '''
+        screens = []
+        for index, screen in enumerate(self.app.screens()):
+            geometry = screen.geometry()
+            screens.append(slm_pb2.ScreenInfo(
+                index=index, name=screen.name(), x=geometry.x(), y=geometry.y(),
+                width=geometry.width(), height=geometry.height(),
+                refresh_rate=screen.refreshRate()))
+        self.display_info = slm_pb2.ScreenReply(num_screens=len(screens), screens=screens,
+                                                active_screen=self.screen_index,
+                                                compression_codecs=list(CODECS))
+        if self.worker is not None:
+            self.worker.display_info = self.display_info
+
+    def show_pixmap(self, pixmap, trace_id=0, transposed=False):
+        '''Put the pixmap onto the screen, reusing the scene's pixmap item
+        If transposed is True, the pixmap is shown transposed
+        '''
+        with tracer.span("show pixmap", trace_id):
+            self.refresh_clock.stop()
+            self.subframes = []
+            self.stop_sweep("The sweep was interrupted by another frame")
+            if self.image_ref is None:
+                self.image_ref = self.scene.addPixmap(pixmap)
+            else:
+                self.image_ref.setPixmap(pixmap)
+            self.image_ref.setTransform(TRANSPOSE if transposed else qg.QTransform())
+            self.front_buffer = pixmap
+            self.front_transposed = transposed
+            if trace_id:
+                self.screen.trace_id = trace_id
+
+    def to_pixmap(self, qimage, trace_id=0):
+        with tracer.span("QPixmap", trace_id):
+            return qg.QPixmap(qimage)
+
+    def grey_pixmap(self, image, trace_id=0):
+        '''Convert a 2d uint8 array to a pixmap, returning the pixmap and whether
+        it holds the transpose of the image
+        '''
+        if line_layout(image) is None:
+            image = np.ascontiguousarray(image)
+        with tracer.span("QImage", trace_id):
+            qimage, transposed = grey_qimage(image)
+        return self.to_pixmap(qimage, trace_id), transposed
+
+    @qc.pyqtSlot(np.ndarray, 'qint64')
+    @reports_errors
+    def set_image(self, image, trace_id=0):
         '''Set the image which is being displayed on the fullscreen plot
         '''
-        if self.image_ref is not None:
-            self.scene.removeItem(self.image_ref)
-        qimage = qg.QImage(image, *image.shape, qg.QImage.Format_Grayscale8)
-        pixmap = qg.QPixmap(qimage)
-        self.image_ref = self.scene.addPixmap(pixmap)
+        tracer.end("signal hop", trace_id)
+        with tracer.span("SLMDisplay.set_image", trace_id):
+            pixmap, transposed = self.grey_pixmap(image, trace_id)
+            self.show_pixmap(pixmap, trace_id, transposed)
 
     @qc.pyqtSlot(np.ndarray)
+    @reports_errors
     def set_image_colour(self, image):
         '''Set the image which is being displayed on the fullscreen plot in colour
+        The image should have axes [height, width, colour]
+        '''
+        image = np.ascontiguousarray(image)
+        qimage = qg.QImage(sip.voidptr(image.ctypes.data), image.shape[1], image.shape[0],
+                           image.strides[0], qg.QImage.Format_RGB888)
+        self.show_pixmap(qg.QPixmap(qimage))
+
+    def show_frame_buffer(self, trace_id=0):
+        '''Put the contents of the frame buffer onto the screen
+        '''
+        with tracer.span("QImage", trace_id):
+            qimage, _ = grey_qimage(self.frame_buffer)
+        self.show_pixmap(self.to_pixmap(qimage, trace_id), trace_id)
+
+    @qc.pyqtSlot(np.ndarray, int, 'qint64')
+    @reports_errors
+    def set_image_blocks(self, image, scale, trace_id=0):
+        '''Set a low resolution image, with each pixel shown as a scale x scale block
+        '''
+        tracer.end("signal hop", trace_id)
+        with tracer.span("SLMDisplay.set_image_blocks", trace_id):
+            with tracer.span("expand", trace_id):
+                expand_blocks(image, scale, self.frame_buffer)
+            self.show_frame_buffer(trace_id)
+
+    @qc.pyqtSlot(np.ndarray, 'qint64')
+    @reports_errors
+    def set_image_tiled(self, period, trace_id=0):
+        '''Set an image by repeating one period of it across the screen
+        '''
+        tracer.end("signal hop", trace_id)
+        with tracer.span("SLMDisplay.set_image_tiled", trace_id):
+            with tracer.span("expand", trace_id):
+                tile(period, self.frame_buffer)
+            self.show_frame_buffer(trace_id)
+
+    @qc.pyqtSlot(np.ndarray, 'qint64')
+    @reports_errors
+    def set_image_dithered(self, subframes, trace_id=0):
+        '''Show an image with finer grey levels than uint8 as a cycle of uint8
+        sub-frames, shown one per screen refresh
+        '''
+        tracer.end("signal hop", trace_id)
+        with tracer.span("SLMDisplay.set_image_dithered", trace_id):
+            # the sub-frames are C ordered, so none of them are transposed
+            pixmaps = [self.grey_pixmap(subframe, trace_id)[0] for subframe in subframes]
+            self.show_pixmap(pixmaps[0], trace_id)
+            if len(pixmaps) > 1:
+                self.subframes = pixmaps
+                self.refresh_clock.start(self.refresh_period())
+
+    def refresh_period(self):
+        '''Get the time between refreshes of the screen in use, in s
+        '''
+        return 1 / (self.app.screens()[self.screen_index].refreshRate() or 60)
+
+    @qc.pyqtSlot(int)
+    @reports_errors
+    def refreshed(self, count):
+        '''Show the sub-frame of the dithered image, or step the sweep, for the
+        count'th refresh since it was put on the screen
+        '''
+        if self.subframes:
+            self.image_ref.setPixmap(self.subframes[count % len(self.subframes)])
+        elif self.sweep is not None:
+            self.next_sweep_frame(count)
+
+    @qc.pyqtSlot(object)
+    @reports_errors
+    def run_sweep(self, sweep):
+        '''Start showing a calibration sweep, replacing any sweep being shown
+        '''
+        self.stop_sweep("The sweep was interrupted by another sweep")
+        sweep.start(self.frame_buffer.shape)
+        self.sweep_buffer = np.empty(self.frame_buffer.shape, dtype=np.uint8)
+        self.show_pixmap(self.grey_pixmap(sweep.frame(0, self.sweep_buffer))[0])
+        self.sweep = sweep
+        self.sweep_shown(0, 0)
+        self.refresh_clock.start(self.refresh_period())
+
+    def sweep_shown(self, index, count):
+        '''Record that the sweep's frame at index was put on the screen at the
+        count'th refresh, and get the next frame ready while it dwells
+        '''
+        self.sweep.shown(index, time.time_ns())
+        self.screen.first_painted_ns = 0
+        self.sweep_index = index
+        self.sweep_shown_count = count
+        self.sweep_pixmap = None
+        if index + 1 < len(self.sweep.levels):
+            self.sweep.frame(index + 1, self.sweep_buffer)
+            self.sweep_pixmap = self.grey_pixmap(self.sweep_buffer)[0]
+
+    def next_sweep_frame(self, count):
+        '''Replace the sweep's frame on the screen with the next one once it has
+        been shown for dwell refreshes, or finish the sweep after its last frame
+        '''
+        sweep = self.sweep
+        if sweep.cancelled:
+            self.stop_sweep("The sweep was cancelled")
+            return
+        if count - self.sweep_shown_count < sweep.dwell:
+            return
+        sweep.hidden(self.screen.first_painted_ns)
+        if self.sweep_pixmap is None:
+            self.sweep = None
+            self.refresh_clock.stop()
+            sweep.finish()
+            return
+        self.image_ref.setPixmap(self.sweep_pixmap)
+        self.front_buffer = self.sweep_pixmap
+        self.sweep_shown(self.sweep_index + 1, count)
+
+    def stop_sweep(self, error):
+        '''Stop the sweep being shown, if there is one, finishing it with the error
+        '''
+        if self.sweep is None:
+            return
+        sweep, self.sweep = self.sweep, None
+        self.refresh_clock.stop()
+        sweep.hidden(self.screen.first_painted_ns)
+        sweep.finish(error)
+
+    def close(self):
+        '''Stop everything the display is cycling through, and close its window.
+        The display's timers can only be stopped from its own thread
+        '''
+        self.refresh_clock.stop()
+        self.stop_sweep("The display was closed")
+        self.screen.close()
+
+    def capture(self):
+        '''Get what the screen shows as a uint8 array the size of the screen,
+        rendered by the view exactly as it paints it
+        '''
+        size = self.screen.viewport().size()
+        frame = np.zeros((size.height(), size.width()), dtype=np.uint8)
+        qimage = qg.QImage(sip.voidptr(frame.ctypes.data), size.width(), size.height(),
+                           frame.strides[0], qg.QImage.Format_Grayscale8)
+        painter = qg.QPainter(qimage)
+        # rendered through the view rather than grabbed from the viewport, which
+        # may be an OpenGL widget
+        self.screen.render(painter, qc.QRectF(qimage.rect()), self.screen.viewport().rect())
+        painter.end()
+        return frame
+
+    @qc.pyqtSlot(object)
+    def capture_to(self, future):
+        '''Set the future to what the screen shows, from any thread
+        '''
+        try:
+            future.set_result(self.capture())
+        except Exception as e:
+            future.set_exception(e)
+
+    @qc.pyqtSlot(np.ndarray)
+    @reports_errors
+    def stage_image(self, image):
+        '''Convert the image into the back buffer, ready to be swapped onto the screen
+        '''
+        self.back_buffer, self.back_transposed = self.grey_pixmap(image)
+
+    @qc.pyqtSlot()
+    @reports_errors
+    def swap(self):
+        '''Show the back buffer, and keep the previous image as the new back buffer
         '''
-        if self.image_ref is not None:
-            self.scene.removeItem(self.image_ref)
-        qimage = qg.QImage(
-            image, image.shape[0], image.shape[1], qg.QImage.Format_RGB888)
-        pixmap = qg.QPixmap(qimage)
-        self.image_ref = self.scene.addPixmap(pixmap)
+        if self.back_buffer is None:
+            return
+        previous = self.front_buffer, self.front_transposed
+        self.show_pixmap(self.back_buffer, transposed=self.back_transposed)
+        self.back_buffer, self.back_transposed = previous
 
 
 if __name__ == '__main__':
@@ -0,0 +1,123 @@
+"""Per-frame tracing of the path from SLMController to the screen.
+
+Spans are only recorded for frames with a trace id. The controller gives each
+frame one when tracing is enabled (tracer.enabled, or the SLMMM_TRACE
+environment variable), and sends it to the server in the call's metadata, so
+the server records spans for exactly the traced frames.
+Spans are kept in a ring buffer and written out in the Chrome trace event
+format, which chrome://tracing and https://ui.perfetto.dev can open.
+Timestamps are wall clock microseconds, so spans from the client and server
+processes on one machine line up on one timeline.
+"""
+import contextlib
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+
+TRACE_METADATA_KEY = "slmmm-trace-id"
+
+
+def now():
+    """The current time in microseconds
+    """
+    return time.time_ns() / 1000
+
+
+class Tracer:
+    """Records trace spans into a ring buffer of the last capacity events
+    """
+
+    def __init__(self, capacity=65536, enabled=None):
+        if enabled is None:
+            enabled = os.environ.get("SLMMM_TRACE", "0") not in ("", "0")
+        self.enabled = enabled
+        self.events = deque(maxlen=capacity)
+
+    def new_trace_id(self):
+        """Get a new trace id for a frame, or 0 (don't trace) if tracing isn't enabled
+        Ids fit in 53 bits so they survive being read as json doubles
+        """
+        if not self.enabled:
+            return 0
+        return random.getrandbits(52) + 1
+
+    def _event(self, name, phase, trace_id, **fields):
+        event = {"name": name, "cat": "slmmm", "ph": phase, "ts": now(),
+                 "pid": os.getpid(), "tid": threading.get_ident(),
+                 "args": {"trace_id": trace_id}}
+        event.update(fields)
+        return event
+
+    @contextlib.contextmanager
+    def _span(self, name, trace_id, args):
+        event = self._event(name, "X", trace_id)
+        event["args"].update(args)
+        try:
+            yield
+        finally:
+            event["dur"] = now() - event["ts"]
+            self.events.append(event)
+
+    def span(self, name, trace_id, **args):
+        """A context manager recording a span around its body, if trace_id isn't 0
+        """
+        if not trace_id:
+            return contextlib.nullcontext()
+        return self._span(name, trace_id, args)
+
+    def begin(self, name, trace_id):
+        """Start a span which may end on a different thread, such as a signal hop
+        """
+        if trace_id:
+            self.events.append(self._event(name, "b", trace_id, id=hex(trace_id)))
+
+    def end(self, name, trace_id):
+        """End a span started with begin
+        """
+        if trace_id:
+            self.events.append(self._event(name, "e", trace_id, id=hex(trace_id)))
+
+    def chrome_events(self):
+        """Get the recorded events, with this process's name, as a list of dicts
+        """
+        name = {"name": "process_name", "ph": "M", "pid": os.getpid(),
+                "args": {"name": f"slmmm {os.getpid()}"}}
+        return [name] + list(self.events)
+
+    def clear(self):
+        self.events.clear()
+
+
+def dump_chrome_trace(path, events):
+    """Write a list of trace events to a Chrome trace event json file
+    """
+    with open(path, "w") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+
+def trace_metadata(trace_id):
+    """Get the grpc call metadata carrying a trace id
+    """
+    return ((TRACE_METADATA_KEY, str(trace_id)),) if trace_id else None
+
+
+def trace_id_from(context):
+    """Get the trace id sent in a grpc call's metadata, or 0 if there isn't a
+    valid one. Clients can send anything, so ids which aren't positive 53 bit
+    integers are ignored
+    """
+    for key, value in context.invocation_metadata() or ():
+        if key == TRACE_METADATA_KEY:
+            try:
+                trace_id = int(value)
+            except (TypeError, ValueError):
+                return 0
+            return trace_id if 0 < trace_id < 2 ** 53 else 0
+    return 0
+
+
+# the tracer for this process
+tracer = Tracer()
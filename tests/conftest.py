@@ -0,0 +1,16 @@
+import os
+
+import pytest
+
+# the display tests run Qt without a real screen
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+
+@pytest.fixture(scope="session")
+def local_slm():
+    """An in-process slm display, shared by the tests that need a real one"""
+    from slmmm import LocalSLMController
+    controller = LocalSLMController()
+    controller.start_server()
+    yield controller
+    controller.stop_server()
@@ -0,0 +1,61 @@
+"""Stand-ins for the display side of the SLM service, shared by the tests."""
+
+import contextlib
+from concurrent import futures
+
+import grpc
+
+from slmmm import slm_pb2, slm_pb2_grpc
+from slmmm.frames import MESSAGE_OPTIONS
+from slmmm.slm_server import SLM
+
+
+class RecordingSignal:
+    """Stands in for a worker's signal, recording everything emitted"""
+
+    def __init__(self):
+        self.emitted = []
+
+    def emit(self, *args):
+        self.emitted.append(args)
+
+
+class RecordingWorker:
+    """Stands in for SLMWorker, recording the frames the server hands to the display"""
+
+    def __init__(self):
+        self.set_image = RecordingSignal()
+        self.set_image_colour = RecordingSignal()
+        self.set_screen = RecordingSignal()
+        self.set_position = RecordingSignal()
+        self.stage_image = RecordingSignal()
+        self.swap = RecordingSignal()
+        self.set_image_blocks = RecordingSignal()
+        self.set_image_tiled = RecordingSignal()
+        self.set_image_dithered = RecordingSignal()
+        self.capture = RecordingSignal()
+        self.run_sweep = RecordingSignal()
+        self.display_info = slm_pb2.ScreenReply()
+
+
+class NoMetadata:
+    """Stands in for a grpc call's context, with no metadata"""
+
+    def invocation_metadata(self):
+        return ()
+
+
+@contextlib.contextmanager
+def recording_server(worker, max_workers=10):
+    """Run an SLM grpc server in this process handing frames to worker
+    Yields the port it's listening on
+    """
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=max_workers),
+                         options=MESSAGE_OPTIONS)
+    slm_pb2_grpc.add_SLMServicer_to_server(SLM(worker), server)
+    port = server.add_insecure_port("localhost:0")
+    server.start()
+    try:
+        yield port
+    finally:
+        server.stop(None)
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+
+"""Tests for the grpc asyncio server."""
+
+import asyncio
+import threading
+
+import grpc
+import numpy as np
+
+from slmmm import slm_pb2, slm_pb2_grpc
+from slmmm.slm_server import AsyncSLM
+
+from tests.helpers import RecordingSignal, RecordingWorker
+
+
+def test_async_server_hands_frames_to_the_display():
+    worker = RecordingWorker()
+    image = np.arange(12, dtype=np.uint8).reshape(3, 4)
+
+    def frame(sequence):
+        return slm_pb2.Image(image_bytes=image.tobytes(), width=4, height=3,
+                             session=slm_pb2.Session(client_id="a", sequence=sequence))
+
+    async def run():
+        server = grpc.aio.server()
+        slm_pb2_grpc.add_SLMServicer_to_server(AsyncSLM(worker), server)
+        port = server.add_insecure_port("localhost:0")
+        await server.start()
+        try:
+            async with grpc.aio.insecure_channel(f"localhost:{port}") as channel:
+                stub = slm_pb2_grpc.SLMStub(channel)
+                assert (await stub.SetImage(frame(1))).completed
+                assert (await stub.SetImageColour(iter([frame(2)] * 3))).completed
+                # an older frame from the same client is dropped
+                assert not (await stub.SetImage(frame(1))).completed
+                assert (await stub.Swap(slm_pb2.EmptyParams())).completed
+        finally:
+            await server.stop(None)
+
+    asyncio.run(run())
+    np.testing.assert_array_equal(worker.set_image.emitted[0][0], image)
+    assert worker.set_image_colour.emitted[0][0].shape == (3, 4, 3)
+    assert len(worker.set_image.emitted) == 1
+    assert worker.swap.emitted == [()]
+
+
+class ThreadSignal(RecordingSignal):
+    """Records the thread each emit is made on"""
+
+    def emit(self, *args):
+        self.emitted.append(threading.get_ident())
+
+
+def test_async_server_decodes_frames_off_the_event_loop():
+    worker = RecordingWorker()
+    worker.set_image_dithered = ThreadSignal()
+    image = np.full((64, 64), 1.5, dtype=np.float32)
+
+    async def run():
+        server = grpc.aio.server()
+        slm_pb2_grpc.add_SLMServicer_to_server(AsyncSLM(worker), server)
+        port = server.add_insecure_port("localhost:0")
+        await server.start()
+        try:
+            async with grpc.aio.insecure_channel(f"localhost:{port}") as channel:
+                reply = await slm_pb2_grpc.SLMStub(channel).SetImage(slm_pb2.Image(
+                    image_bytes=image.tobytes(), width=64, height=64,
+                    pixel_type=slm_pb2.FLOAT32))
+                assert reply.completed
+        finally:
+            await server.stop(None)
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(run())
+    assert len(worker.set_image_dithered.emitted) == 1
+    assert worker.set_image_dithered.emitted[0] != loop_thread
@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+
+"""Tests for calibration sweeps."""
+
+import numpy as np
+import pytest
+
+from slmmm import slm_pb2
+from slmmm.calibration import Sweep, check_events
+
+
+def test_frames():
+    out = np.empty((4, 10), dtype=np.uint8)
+    uniform = Sweep(slm_pb2.UNIFORM, levels=[3, 200])
+    uniform.start(out.shape)
+    assert np.all(uniform.frame(1, out) == 200)
+
+    split = Sweep(slm_pb2.SPLIT_SCREEN, levels=[7], reference=1)
+    split.start(out.shape)
+    split.frame(0, out)
+    assert np.all(out[:, :5] == 1) and np.all(out[:, 5:] == 7)
+
+    steps = Sweep(slm_pb2.PHASE_STEPS, levels=[9], reference=2, period=3)
+    steps.start(out.shape)
+    np.testing.assert_array_equal(steps.frame(0, out)[0], [2, 2, 2, 9, 9, 9, 2, 2, 2, 9])
+
+
+def test_invalid_sweeps():
+    for kwargs in [{"levels": []}, {"levels": [256]}, {"dwell": 0}, {"pattern": 7}]:
+        with pytest.raises(ValueError):
+            Sweep(**kwargs)
+
+
+def test_events():
+    sweep = Sweep(levels=[5, 6, 7])
+    sweep.shown(0, 100)
+    sweep.hidden(150)
+    sweep.shown(1, 200)
+    sweep.hidden(150)
+    sweep.shown(2, 300)
+    sweep.hidden(310)
+    sweep.finish("stopped")
+    events = list(sweep)
+    assert [(e.index, e.level, e.shown_ns, e.painted_ns) for e in events[:3]] == \
+        [(0, 5, 100, 150), (1, 6, 200, 0), (2, 7, 300, 310)]
+    with pytest.raises(RuntimeError, match="stopped"):
+        list(check_events(events))
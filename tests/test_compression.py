@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+
+"""Tests for the adaptive image compression."""
+
+import zlib
+
+import numpy as np
+import pytest
+
+from slmmm import slm_pb2
+from slmmm.compression import CompressionPolicy, decompress
+from slmmm.slm_server import decode_image
+
+
+@pytest.mark.parametrize("codec", [slm_pb2.ZLIB, slm_pb2.LZMA, slm_pb2.BZ2])
+def test_round_trip(codec):
+    data = np.tile(np.arange(256, dtype=np.uint8), 64).tobytes()
+    payload, used = CompressionPolicy(codec).encode(data)
+    assert used == codec
+    assert len(payload) < len(data)
+    assert decompress(payload, used, len(data)) == data
+    with pytest.raises(ValueError):
+        decompress(payload[:10], used, len(data))
+    with pytest.raises(ValueError):
+        decompress(payload, used, len(data) - 1)
+
+
+def test_decompression_stops_at_the_frame_size():
+    # a few kB which would decompress to 100 MB
+    bomb = zlib.compress(bytes(100_000_000), 9)
+    with pytest.raises(ValueError):
+        decompress(bomb, slm_pb2.ZLIB, 1000)
+    image = slm_pb2.Image(image_bytes=bomb, width=10, height=10, compression=slm_pb2.ZLIB)
+    with pytest.raises(ValueError):
+        decode_image(image)
+
+
+def test_policy_follows_the_link():
+    data = bytes(1 << 16)
+    policy = CompressionPolicy(probe_every=0)
+    policy.encode(data)
+    # a link far faster than compressing: send raw
+    policy.record_send(len(data), 1e-9)
+    assert policy.encode(data)[1] == slm_pb2.NO_COMPRESSION
+    # a very slow link: compress
+    policy.link_rate = 1.0
+    assert policy.encode(data)[1] == slm_pb2.ZLIB
+    assert policy.stats()["frames"] == 3
@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+
+"""Tests for what the display shows, on an offscreen screen."""
+
+import time
+
+import numpy as np
+
+
+def test_stage_and_swap_alternate(local_slm):
+    shape = local_slm.screen_shape()
+    shown, staged = np.full(shape, 200, np.uint8), np.full(shape, 10, np.uint8)
+    local_slm.set_image(shown)
+    local_slm.stage_image(staged)
+    # staging doesn't change the screen
+    assert np.all(local_slm.displayed_frame() == 200)
+    seen = []
+    for _ in range(3):
+        local_slm.swap()
+        seen.append(int(local_slm.displayed_frame()[0, 0]))
+    assert seen == [10, 200, 10]
+
+
+def test_failing_frames_dont_stop_the_display(local_slm, capsys):
+    local_slm.set_image(np.full(local_slm.screen_shape(), 7, np.uint8))
+    # straight to the display, bypassing any checks on the way
+    local_slm._post(local_slm.display.set_image_tiled, np.zeros((0, 3), np.uint8), 0)
+    assert local_slm.flush(5)
+    assert "set_image_tiled failed" in capsys.readouterr().out
+    assert np.all(local_slm.displayed_frame() == 7)
+
+
+def test_dithered_subframes_follow_the_screen_refreshes(local_slm):
+    refreshes = []
+
+    def record(count):
+        refreshes.append((count, time.perf_counter()))
+
+    clock = local_slm.display.refresh_clock
+    local_slm._post(clock.refreshed.connect, record)
+    local_slm.set_image(np.full(local_slm.screen_shape(), 10.5, np.float32))
+    time.sleep(0.3)
+    local_slm._post(clock.refreshed.disconnect, record)
+    local_slm.set_image(np.zeros(local_slm.screen_shape(), np.uint8))
+    assert local_slm.flush(5)
+
+    period = local_slm.display.refresh_period()
+    counts, times = zip(*refreshes)
+    assert len(counts) > 5
+    assert all(a < b for a, b in zip(counts, counts[1:]))
+    # each count is the number of whole refresh periods since the image was shown
+    assert abs((times[-1] - times[0]) - (counts[-1] - counts[0]) * period) < period
+
+
+def test_sweep_frames_dwell_for_whole_refreshes(local_slm):
+    events = list(local_slm.calibration_sweep("uniform", levels=[10, 20, 30, 40], dwell=3))
+    assert [(event.index, event.level) for event in events] == [(0, 10), (1, 20), (2, 30), (3, 40)]
+    period_ns = 1e9 * local_slm.display.refresh_period()
+    for event in events:
+        # the first paint after the frame was shown, not the last before it was hidden
+        assert event.shown_ns <= event.painted_ns < event.shown_ns + 2 * period_ns
+    for shown, next_shown in zip(events, events[1:]):
+        assert abs(next_shown.shown_ns - shown.shown_ns - 3 * period_ns) < period_ns
+    assert local_slm.displayed_frame()[0, 0] == 40
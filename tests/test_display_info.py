@@ -0,0 +1,36 @@
+#!/usr/bin/env python
+
+"""Tests for asking the server about its screens."""
+
+from slmmm import slm_pb2
+from slmmm.slm_controller import SLMController
+
+from tests.helpers import RecordingWorker, recording_server
+
+
+def screens(*sizes):
+    return slm_pb2.ScreenReply(num_screens=len(sizes), active_screen=len(sizes) - 1, screens=[
+        slm_pb2.ScreenInfo(index=index, width=width, height=height, refresh_rate=60)
+        for index, (width, height) in enumerate(sizes)])
+
+
+def test_display_info_is_cached_until_the_screen_changes():
+    worker = RecordingWorker()
+    worker.display_info = screens((8, 4))
+    with recording_server(worker) as port:
+        controller = SLMController(port)
+        assert controller.display_info() == screens((8, 4))
+        buffer = controller.frame_buffer()
+        assert buffer.shape == (4, 8)
+
+        worker.display_info = screens((8, 4), (16, 2))
+        # still the cached reply, and the same buffer
+        assert controller.screen_shape() == (4, 8)
+        assert controller.frame_buffer() is buffer
+        assert controller.display_info(refresh=True).num_screens == 2
+        assert controller.frame_buffer().shape == (2, 16)
+
+        controller.set_screen(0)
+        worker.display_info = screens((10, 6))
+        assert worker.set_screen.emitted == [(0,)]
+        assert controller.screen_shape() == (6, 10)
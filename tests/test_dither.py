@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+
+"""Tests for temporal dithering of fine grey levels."""
+
+import numpy as np
+import pytest
+
+from slmmm.dither import dither
+from slmmm.slm_controller import SLMController
+
+from tests.helpers import RecordingWorker, recording_server
+
+
+@pytest.mark.parametrize("subframes", [1, 4, 8, 16])
+def test_average_reproduces_levels(subframes):
+    levels = np.random.default_rng(0).uniform(0, 255, (37, 53)).astype(np.float32)
+    frames = dither(levels, subframes)
+    assert frames.shape == (subframes, 37, 53) and frames.dtype == np.uint8
+    assert np.all(np.abs(frames.mean(axis=0) - levels) <= 1 / subframes)
+
+
+def test_uint16_levels_and_wrapping():
+    image = np.array([[256 * 7 + 128, 256 * 255 + 192]], dtype=np.uint16)
+    frames = dither(image, 4)
+    assert sorted(frames[:, 0, 0]) == [7, 7, 8, 8]
+    # 255.75 steps up to 256, which wraps around to 0
+    assert sorted(frames[:, 0, 1]) == [0, 0, 0, 255]
+
+
+def test_subframes_checked():
+    with pytest.raises(ValueError):
+        dither(np.zeros((2, 2), np.float32), 0)
+
+
+def test_full_hd_float_frames_fit_in_a_message():
+    worker = RecordingWorker()
+    with recording_server(worker) as port:
+        controller = SLMController(port, use_cache=False, compression=None, subframes=2)
+        controller.set_image(np.full((1080, 1920), 3.5, dtype=np.float32))
+    subframes, _ = worker.set_image_dithered.emitted[0]
+    assert subframes.shape == (2, 1080, 1920)
+    assert np.all(subframes.mean(axis=0) == 3.5)
+
+
+def test_cached_dithered_frames_keep_their_subframes():
+    worker = RecordingWorker()
+    image = np.full((4, 6), 10.25, dtype=np.float32)
+    with recording_server(worker) as port:
+        for subframes in [4, 8, 4]:
+            SLMController(port, subframes=subframes).set_image(image)
+    assert [frames.shape[0] for frames, _ in worker.set_image_dithered.emitted] == [4, 8, 4]
+
+
+@pytest.mark.parametrize("dtype", [np.uint16, np.float32])
+def test_only_set_image_dithers(dtype):
+    worker = RecordingWorker()
+    # laid out so that reading it as uint8 would give a frame of the same size
+    image = np.asfortranarray(np.full((6, 8), 300, dtype))[1:5, 2:7]
+    with recording_server(worker) as port:
+        controller = SLMController(port, use_cache=False, compression=None)
+        with pytest.raises(ValueError, match="Only uint8 images can be staged"):
+            controller.stage_image(image)
+        with pytest.raises(ValueError, match="Only uint8 images can be scaled"):
+            controller.set_image_scaled(image, 2)
+        with pytest.raises(ValueError, match="Only uint8 images can be scaled"):
+            controller.set_image_tiled(image)
+        with pytest.raises(ValueError, match="Only uint8 images can be shown in colour"):
+            controller.set_image_colour(np.stack([image] * 3))
+    assert not any(signal.emitted for signal in [
+        worker.stage_image, worker.set_image_blocks, worker.set_image_tiled,
+        worker.set_image_colour])
@@ -0,0 +1,22 @@
+#!/usr/bin/env python
+
+"""Tests for staging frames and swapping them onto the screen."""
+
+import numpy as np
+
+from slmmm.slm_controller import SLMController
+
+from tests.helpers import RecordingWorker, recording_server
+
+
+def test_staged_frames_wait_for_swap():
+    worker = RecordingWorker()
+    image = np.arange(16, dtype=np.uint8).reshape(4, 4)
+    with recording_server(worker) as port:
+        controller = SLMController(port)
+        controller.stage_image(image)
+        assert worker.swap.emitted == []
+        controller.swap()
+    np.testing.assert_array_equal(worker.stage_image.emitted[0][0], image)
+    assert worker.swap.emitted == [()]
+    assert worker.set_image.emitted == []
@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+
+"""Tests for expanding low resolution and periodic images."""
+
+import numpy as np
+import pytest
+
+from slmmm import slm_pb2
+from slmmm.expand import expand_blocks, tile
+from slmmm.slm_server import SLM, reports_errors
+
+from tests.helpers import NoMetadata, RecordingWorker
+
+
+@pytest.mark.parametrize("out_shape", [(12, 16), (13, 17), (7, 30), (40, 40)])
+def test_expand_blocks_matches_repeat(out_shape):
+    image = np.random.randint(0, 256, (6, 8), dtype=np.uint8)
+    out = np.full(out_shape, 99, dtype=np.uint8)
+    expand_blocks(image, 2, out)
+    expected = np.zeros(out_shape, dtype=np.uint8)
+    repeated = np.repeat(np.repeat(image, 2, axis=0), 2, axis=1)
+    h, w = min(out_shape[0], 12), min(out_shape[1], 16)
+    expected[:h, :w] = repeated[:h, :w]
+    np.testing.assert_array_equal(out, expected)
+
+
+@pytest.mark.parametrize("out_shape", [(12, 16), (13, 17), (2, 3), (50, 9)])
+def test_tile_matches_numpy_tile(out_shape):
+    period = np.random.randint(0, 256, (4, 5), dtype=np.uint8)
+    out = np.zeros(out_shape, dtype=np.uint8)
+    tile(period, out)
+    expected = np.tile(period, (out_shape[0] // 4 + 1, out_shape[1] // 5 + 1))
+    np.testing.assert_array_equal(out, expected[:out_shape[0], :out_shape[1]])
+
+
+def test_empty_images_rejected():
+    out = np.zeros((4, 4), dtype=np.uint8)
+    with pytest.raises(ValueError):
+        tile(np.zeros((0, 3), dtype=np.uint8), out)
+    with pytest.raises(ValueError):
+        expand_blocks(np.zeros((2, 0), dtype=np.uint8), 2, out)
+    with pytest.raises(ValueError):
+        expand_blocks(np.ones((2, 2), dtype=np.uint8), 0, out)
+
+
+def test_server_rejects_empty_tiles_and_blocks():
+    worker = RecordingWorker()
+    servicer = SLM(worker)
+    for request in [slm_pb2.Image(width=3, height=0, tile=True),
+                    slm_pb2.Image(width=0, height=2, block_scale=4),
+                    slm_pb2.Image(image_bytes=bytes(4), width=2, height=2, block_scale=-1),
+                    slm_pb2.Image(image_bytes=bytes(4), width=-1, height=-4, tile=True)]:
+        assert not servicer.SetImage(request, NoMetadata()).completed
+    assert not worker.set_image_tiled.emitted and not worker.set_image_blocks.emitted
+
+
+def test_failing_display_slots_are_reported(capsys):
+    @reports_errors
+    def set_image_tiled(period):
+        tile(period, np.zeros((4, 4), dtype=np.uint8))
+
+    set_image_tiled(np.zeros((0, 3), dtype=np.uint8))
+    assert "set_image_tiled failed" in capsys.readouterr().out
@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+
+"""Tests for the frame deduplication cache."""
+
+import numpy as np
+
+from slmmm.frame_cache import FrameCache, frame_digest, serialised_digest
+from slmmm.frames import serialise
+from slmmm.slm_controller import SLMController
+
+from tests.helpers import RecordingWorker, recording_server
+
+
+def test_digest_depends_on_shape():
+    image = np.arange(12, dtype=np.uint8)
+    assert frame_digest(image.reshape(3, 4)) != frame_digest(image.reshape(4, 3))
+    assert frame_digest(image.reshape(3, 4)) == frame_digest(image.reshape(3, 4).copy())
+
+
+def test_cache_evicts_least_recently_used():
+    cache = FrameCache(max_bytes=200)
+    images = [np.full((10, 10), i, dtype=np.uint8) for i in range(3)]
+    cache.put(b"a", images[0])
+    cache.put(b"b", images[1])
+    assert cache.get(b"a") is images[0]
+    cache.put(b"c", images[2])
+    assert b"b" not in cache
+    assert cache.get(b"a") is images[0]
+    assert cache.get(b"c") is images[2]
+    assert cache.nbytes == 200
+
+
+def test_cache_stats():
+    cache = FrameCache()
+    image = np.zeros((10, 10), dtype=np.uint8)
+    assert cache.get(b"a") is None
+    cache.put(b"a", image)
+    cache.get(b"a")
+    cache.get(b"a")
+    assert cache.stats.hits == 2
+    assert cache.stats.misses == 1
+    assert cache.stats.bytes_saved == 200
+    assert abs(cache.stats.hit_rate - 2 / 3) < 1e-12
+
+
+def test_digest_of_the_bytes_sent():
+    image = np.asfortranarray(np.arange(12, dtype=np.uint8).reshape(3, 4))
+    data, strides = serialise(image)
+    assert serialised_digest(data, strides, image.shape, image.dtype) == frame_digest(image)
+    # the layout is part of the digest
+    assert frame_digest(image) != frame_digest(np.ascontiguousarray(image))
+    assert frame_digest(image) != frame_digest(image, "subframes=4")
+
+
+def test_controller_caches_frames_in_their_layout():
+    worker = RecordingWorker()
+    image = np.asfortranarray(np.arange(35, dtype=np.uint8).reshape(5, 7))
+    with recording_server(worker) as port:
+        controller = SLMController(port, compression=None)
+        controller.set_image(image)
+        controller.set_image(image.copy(order="F"))
+    assert controller.cache_stats.hits == 1
+    for received, _ in worker.set_image.emitted:
+        np.testing.assert_array_equal(received, image)
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+
+"""Tests for sending frames in their own memory layout."""
+
+import numpy as np
+import pytest
+
+from slmmm.frames import deserialise, line_layout, serialise
+from slmmm.slm_controller import SLMController
+
+from tests.helpers import RecordingWorker, recording_server
+
+base = np.arange(7 * 13, dtype=np.uint8).reshape(7, 13)
+
+
+@pytest.mark.parametrize("image, strides", [
+    (base, ()),
+    (np.asfortranarray(base), (1, 7)),
+    (base[1:6, 2:12], (13, 1)),
+    (np.asfortranarray(base)[1:6, 2:12], (1, 7)),
+    (base[:, :2], ()),
+    (base[::2, ::3], ()),
+    (base[::-1], ()),
+    (np.asfortranarray(base.astype("<u2"))[1:6, 2:12], (2, 14)),
+    (base.astype("<f4")[1:6, 2:12], (52, 4)),
+])
+def test_round_trip(image, strides):
+    data, sent_strides = serialise(image)
+    assert sent_strides == strides
+    frame = deserialise(data, *image.shape, sent_strides, image.dtype)
+    np.testing.assert_array_equal(frame, image)
+
+
+def test_rejects_frames_outside_the_bytes():
+    data, strides = serialise(base[1:6, 2:12])
+    with pytest.raises(ValueError):
+        deserialise(data, 6, 10, strides)
+    with pytest.raises(ValueError):
+        deserialise(data, 5, 10, (-13, 1))
+    with pytest.raises(ValueError):
+        deserialise(data, -5, 10)
+
+
+def test_line_layout():
+    assert line_layout(base) == (13, False)
+    assert line_layout(np.asfortranarray(base)) == (7, True)
+    assert line_layout(base[::2, ::3]) is None
+    assert line_layout(base.astype(np.uint16)) == (26, False)
+
+
+def test_controller_sends_frames_in_their_layout():
+    worker = RecordingWorker()
+    with recording_server(worker, max_workers=2) as port:
+        controller = SLMController(port, use_cache=False, compression=None)
+        images = [base, np.asfortranarray(base), base[1:6, 2:12], base[::2, ::3]]
+        for image in images:
+            controller.set_image(image)
+    received = [image for image, _ in worker.set_image.emitted]
+    assert len(received) == len(images)
+    for sent, image in zip(images, received):
+        np.testing.assert_array_equal(image, sent)
+    assert not received[1].flags.c_contiguous
+
+
+def test_every_send_path_keeps_the_layout():
+    worker = RecordingWorker()
+    image = np.asfortranarray(base)[1:6, 2:12]
+    with recording_server(worker) as port:
+        controller = SLMController(port, use_cache=False, compression=None)
+        controller.stage_image(image)
+        controller.set_image_scaled(image, 2)
+        controller.set_image_tiled(image)
+        controller.set_image_colour(np.moveaxis(np.stack([image] * 3, axis=2), 2, 0))
+    np.testing.assert_array_equal(worker.stage_image.emitted[0][0], image)
+    np.testing.assert_array_equal(worker.set_image_blocks.emitted[0][0], image)
+    np.testing.assert_array_equal(worker.set_image_tiled.emitted[0][0], image)
+    np.testing.assert_array_equal(worker.set_image_colour.emitted[0][0],
+                                  np.stack([image] * 3, axis=2))
@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+
+"""Tests for the multi-spot gratings and lenses holograms."""
+
+import numpy as np
+
+from slmmm.holograms import MultiSpotHologram, gratings_and_lenses
+
+
+def direct_field(shape, spots, weights, phases):
+    height, width = shape
+    v, u = np.mgrid[:height, :width]
+    v = v - height // 2
+    u = u - width // 2
+    radius = max(shape) / 2
+    field = np.zeros(shape, dtype=complex)
+    for (x, y, z), w, p in zip(spots, weights, phases):
+        field += w * np.exp(1j * (p + 2 * np.pi * (x * u / width + y * v / height)
+                                  + z * (u ** 2 + v ** 2) / radius ** 2))
+    return field
+
+
+def test_field_matches_per_spot_sum():
+    shape = (24, 40)
+    spots = [(3, -2, 0.5), (-5, 4, -1.0), (1.5, 0, 2.0)]
+    weights = [1.0, 0.5, 2.0]
+    hologram = MultiSpotHologram(shape, spots, weights, phases="random", seed=1)
+    expected = direct_field(shape, spots, weights, hologram.phases)
+    np.testing.assert_allclose(hologram.field, expected, atol=1e-4)
+
+
+def test_moving_spots_matches_recompute():
+    shape = (32, 32)
+    spots = np.random.default_rng(0).uniform(-8, 8, (20, 3))
+    hologram = MultiSpotHologram(shape, spots, phases="random", seed=2)
+    moved = spots.copy()
+    moved[[2, 7]] = [(1, 1, 0), (-3, 5, 1)]
+    hologram.move_spots([2, 7], moved[[2, 7]])
+    expected = direct_field(shape, moved, np.ones(20), hologram.phases)
+    np.testing.assert_allclose(hologram.field, expected, atol=1e-3)
+
+
+def test_single_spot_lands_in_far_field():
+    shape = (32, 64)
+    frame = gratings_and_lenses(shape, [(5, 3, 0)])
+    far_field = np.abs(np.fft.fft2(np.exp(2j * np.pi * frame / 256)))
+    row, column = np.unravel_index(np.argmax(far_field), shape)
+    assert (row, column) == (3, 5)
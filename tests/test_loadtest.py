@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+
+"""Tests for load testing an SLM server."""
+
+import math
+import socket
+
+import pytest
+
+from slmmm.loadtest import load_test, main, parse_mix, summarise
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("localhost", 0))
+        return s.getsockname()[1]
+
+
+def test_parse_mix():
+    assert parse_mix(["SetImage=3", "SetScreen"]) == {"SetImage": 3.0, "SetScreen": 1.0}
+    with pytest.raises(ValueError):
+        parse_mix(["GetFrame=1"])
+
+
+def test_summarise():
+    reports = [
+        {"SetImage": {"latencies": [0.001, 0.003], "rejected": 1, "errors": 0},
+         "SetScreen": {"latencies": [], "rejected": 0, "errors": 2}},
+        {"SetImage": {"latencies": [0.002], "rejected": 0, "errors": 1}},
+    ]
+    summary = summarise(reports, duration=2.0)
+    assert summary["SetImage"]["calls"] == 4
+    assert summary["SetImage"]["p50"] == pytest.approx(2.0)
+    assert summary["SetImage"]["throughput"] == 1.5
+    assert summary["SetImage"]["error_rate"] == 0.25
+    # an rpc whose calls all failed has no latencies
+    assert summary["SetScreen"]["error_rate"] == 1.0
+    assert all(math.isnan(summary["SetScreen"][p]) for p in ["p50", "p95", "p99"])
+    assert summary["total"]["calls"] == 6
+    assert summary["total"]["error_rate"] == 0.5
+    assert summary["total"]["reject_rate"] == pytest.approx(1 / 6)
+
+
+def test_clients_checked():
+    with pytest.raises(SystemExit):
+        main(["--clients", "0"])
+
+
+def test_load_test():
+    summary = load_test(free_port(), clients=1, sizes=(16,), duration=0.5)
+    assert summary["SetImage"]["calls"] > 0
+    assert summary["total"]["error_rate"] == 0.0
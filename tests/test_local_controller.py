@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+
+"""Tests for driving the display in this process."""
+
+import numpy as np
+import pytest
+
+from slmmm import LocalSLMController, SLMController, open_controller
+from slmmm.local_controller import FrameMailbox
+
+from tests.helpers import RecordingWorker, recording_server
+
+
+def test_mailbox_replaces_waiting_frames():
+    mailbox = FrameMailbox()
+    assert mailbox.post(print, 1, replaceable=True)
+    assert not mailbox.post(print, 2, replaceable=True)
+    # a command which isn't a frame is kept, and so is the frame before it
+    mailbox.post(len, "a")
+    mailbox.post(print, 3, replaceable=True)
+    mailbox.post(print, 4, replaceable=True)
+    assert mailbox.take() == [(print, (2,)), (len, ("a",)), (print, (4,))]
+    assert mailbox.take() == []
+
+
+def test_flush_waits_for_frames_to_be_shown(local_slm):
+    shape = local_slm.screen_shape()
+    for level in range(50):
+        local_slm.set_image(np.full(shape, level, np.uint8))
+    assert local_slm.flush(5)
+    # nothing sent before the flush is still waiting
+    assert local_slm.mailbox.take() == []
+    assert local_slm.displayed_frame()[0, 0] == 49
+
+
+def test_local_frames_are_checked_like_the_server_does(local_slm):
+    with pytest.raises(ValueError):
+        local_slm.stage_image(np.zeros((4, 4), np.uint16))
+    with pytest.raises(ValueError):
+        local_slm.set_image_tiled(np.zeros((0, 4), np.uint8))
+    with pytest.raises(ValueError):
+        local_slm.set_image_scaled(np.ones((4, 4), np.uint8), 0)
+    with pytest.raises(ValueError):
+        local_slm.set_image_scaled(np.ones((4, 4), np.float32), 2)
+
+
+def test_open_controller(monkeypatch):
+    assert type(open_controller(50051, local=False)) is SLMController
+    assert type(open_controller(local=True)) is LocalSLMController
+    monkeypatch.setenv("SLMMM_LOCAL", "1")
+    assert type(open_controller()) is LocalSLMController
+    monkeypatch.setenv("SLMMM_LOCAL", "0")
+    assert type(open_controller(50051)) is SLMController
+    for local in [False, True]:
+        controller = open_controller(50051, local, subframes=4, priority=2, use_cache=False,
+                                     compression=None)
+        assert controller.subframes == 4
+    with pytest.raises(TypeError):
+        open_controller(local=True, subframe=4)
+
+
+def test_both_controllers_reject_the_same_frames(local_slm):
+    frames = [
+        ("set_image", np.zeros((0, 4), np.uint8)),
+        ("stage_image", np.zeros((4, 4), np.uint16)),
+        ("set_image_tiled", np.zeros((4, 4), np.float32)),
+        ("set_image_colour", np.zeros((2, 4, 4), np.uint8)),
+        ("set_image_colour", np.zeros((3, 4, 4), np.float32)),
+    ]
+    worker = RecordingWorker()
+    with recording_server(worker) as port:
+        remote = SLMController(port, use_cache=False, compression=None)
+        for method, image in frames:
+            with pytest.raises(ValueError) as remote_error:
+                getattr(remote, method)(image)
+            with pytest.raises(ValueError) as local_error:
+                getattr(local_slm, method)(image)
+            assert str(local_error.value) == str(remote_error.value)
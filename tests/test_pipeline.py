@@ -0,0 +1,36 @@
+#!/usr/bin/env python
+
+"""Tests for generating frames in a process pool."""
+
+import subprocess
+import sys
+
+import numpy as np
+
+from slmmm.slm_controller import SLMController
+
+from tests.helpers import RecordingWorker, recording_server
+
+
+def level_frame(level):
+    return np.full((4, 6), level, dtype=np.uint8)
+
+
+def test_pipeline_sends_frames_in_order_and_callbacks_keep_them():
+    worker = RecordingWorker()
+    kept = []
+    with recording_server(worker) as port:
+        controller = SLMController(port, use_cache=False, compression=None)
+        sent = controller.run_pipeline(level_frame, range(8), processes=2,
+                                       callback=lambda index, param, frame: kept.append(frame))
+    assert sent == 8
+    # the frames' shared memory is gone, so these would be garbage if they were views of it
+    for level, frame in enumerate(kept):
+        np.testing.assert_array_equal(frame, level_frame(level))
+    assert [int(image[0, 0]) for image, _ in worker.set_image.emitted] == list(range(8))
+
+
+def test_controller_imports_without_shared_memory():
+    # as on python versions before 3.8, where only pipelines can't run
+    code = "import sys; sys.modules['multiprocessing.shared_memory'] = None; import slmmm"
+    subprocess.run([sys.executable, "-c", code], check=True)
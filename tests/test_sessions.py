@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+
+"""Tests for ordering frames from concurrent clients."""
+
+import threading
+import time
+from concurrent import futures
+
+import grpc
+import numpy as np
+import pytest
+
+from slmmm import slm_pb2, slm_pb2_grpc
+from slmmm.sessions import FrameSequencer
+from slmmm.slm_controller import SLMController
+from slmmm.slm_server import SLM
+
+from tests.helpers import NoMetadata, RecordingWorker, recording_server
+
+
+def session(client_id, sequence, priority=0):
+    return slm_pb2.Session(client_id=client_id, sequence=sequence, priority=priority)
+
+
+def test_stale_sequence_rejected():
+    sequencer = FrameSequencer()
+    shown = []
+    assert sequencer.submit(sequencer.ticket(), session("a", 2), lambda: shown.append(2)) is None
+    assert sequencer.submit(sequencer.ticket(), session("a", 1), lambda: shown.append(1))
+    assert shown == [2]
+
+
+def test_later_arrival_from_other_client_wins():
+    sequencer = FrameSequencer()
+    shown = []
+    first, second = sequencer.ticket(), sequencer.ticket()
+    assert sequencer.submit(second, session("b", 1), lambda: shown.append("b")) is None
+    assert sequencer.submit(first, session("a", 1), lambda: shown.append("a"))
+    assert shown == ["b"]
+
+
+def test_priority_holds_display():
+    sequencer = FrameSequencer(priority_hold=60)
+    shown = []
+    sequencer.submit(sequencer.ticket(), session("high", 1, 5), lambda: shown.append("high"))
+    assert sequencer.submit(sequencer.ticket(), session("low", 1), lambda: shown.append("low"))
+    sequencer.forget("high")
+    assert sequencer.submit(sequencer.ticket(), session("low", 2),
+                            lambda: shown.append("low")) is None
+    assert shown == ["high", "low"]
+
+
+def test_idle_clients_forgotten():
+    sequencer = FrameSequencer(client_timeout=0.05)
+    for i in range(100):
+        sequencer.submit(sequencer.ticket(), session(f"client {i}", 1), lambda: None)
+    time.sleep(0.1)
+    sequencer.submit(sequencer.ticket(), session("new", 1), lambda: None)
+    assert list(sequencer._last_sequence) == ["new"]
+
+
+def test_last_submitted_frame_wins_under_load():
+    worker = RecordingWorker()
+    with recording_server(worker) as port:
+        controller = SLMController(port, use_cache=False)
+        submitted = []
+        lock = threading.Lock()
+
+        def send(i):
+            # alternate large and small frames so uploads finish out of order
+            size = 1024 if i % 2 else 8
+            with lock:
+                frame_session = controller._session()
+                submitted.append(frame_session.sequence)
+            image = np.zeros((size, size), dtype=np.uint8)
+            image[0, :2] = divmod(frame_session.sequence, 256)
+            with grpc.insecure_channel(f"localhost:{port}") as channel:
+                slm_pb2_grpc.SLMStub(channel).SetImage(slm_pb2.Image(
+                    image_bytes=image.tobytes(), width=size, height=size,
+                    session=frame_session))
+
+        with futures.ThreadPoolExecutor(max_workers=16) as pool:
+            list(pool.map(send, range(200)))
+
+    shown = [256 * int(image[0, 0]) + int(image[0, 1])
+             for image, _ in worker.set_image.emitted]
+    assert shown[-1] == max(submitted)
+    assert all(a < b for a, b in zip(shown, shown[1:]))
+
+
+def test_streamed_frame_is_ordered_by_when_it_finishes_arriving():
+    worker = RecordingWorker()
+    servicer = SLM(worker)
+    channel = np.zeros((2, 3), dtype=np.uint8)
+
+    def colour_stream():
+        yield slm_pb2.Image(image_bytes=channel.tobytes(), width=3, height=2,
+                            session=session("colour", 1))
+        # another client's frame arrives whole while the stream is still coming in
+        assert servicer.SetImage(slm_pb2.Image(image_bytes=channel.tobytes(), width=3, height=2,
+                                               session=session("grey", 1)),
+                                 NoMetadata()).completed
+        for _ in range(2):
+            yield slm_pb2.Image(image_bytes=channel.tobytes(), width=3, height=2)
+
+    assert servicer.SetImageColour(colour_stream(), NoMetadata()).completed
+    assert len(worker.set_image.emitted) == 1
+    assert worker.set_image_colour.emitted[0][0].shape == (2, 3, 3)
+
+
+def test_controllers_raise_when_their_frames_are_rejected():
+    worker = RecordingWorker()
+    image = np.zeros((4, 4), dtype=np.uint8)
+    with recording_server(worker) as port:
+        SLMController(port, priority=5).set_image(image)
+        low = SLMController(port)
+        with pytest.raises(ValueError, match="higher priority"):
+            low.set_image(image + 1)
+        # the server holds the first frame, so this one is a cache hit
+        with pytest.raises(ValueError, match="higher priority"):
+            low.set_image(image)
+        with pytest.raises(ValueError, match="higher priority"):
+            low.set_image_tiled(image)
+    assert len(worker.set_image.emitted) == 1
@@ -0,0 +1,43 @@
+#!/usr/bin/env python
+
+"""Tests for the simulated camera."""
+
+import time
+
+import numpy as np
+import pytest
+
+from slmmm.holograms import gratings_and_lenses
+from slmmm.simulation import SimulatedCamera
+
+shape = (60, 80)
+
+
+def test_grating_steers_the_spot():
+    camera = SimulatedCamera(None)
+    blank = camera.far_field(np.zeros(shape, dtype=np.uint8))
+    assert np.isclose(blank.sum(), 1, atol=1e-4)
+    assert np.unravel_index(blank.argmax(), shape) == (30, 40)
+    spot = camera.far_field(gratings_and_lenses(shape, [(10, -5, 0)]))
+    assert np.unravel_index(spot.argmax(), shape) == (25, 50)
+    assert spot.max() > 0.95
+
+
+def test_aberrations_spread_the_spot():
+    frame = np.zeros(shape, dtype=np.uint8)
+    aberrated = SimulatedCamera(None, aberrations={"defocus": 3}).far_field(frame)
+    assert np.isclose(aberrated.sum(), 1, atol=1e-4)
+    assert aberrated.max() < 0.5
+    with pytest.raises(ValueError):
+        SimulatedCamera(None, aberrations={"wobble": 1}).far_field(frame)
+
+
+def test_capture_noise_saturation_and_latency():
+    frame = np.zeros(shape, dtype=np.uint8)
+    camera = SimulatedCamera(lambda: frame, gain=2, saturation=1.5, noise=0.01,
+                             exposure=0.02, latency=0.03, seed=0)
+    start = time.perf_counter()
+    image = camera.capture()
+    assert time.perf_counter() - start >= 0.05
+    assert image.max() == 1.5
+    assert 0 < image.std() < 0.3
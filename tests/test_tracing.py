@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+
+"""Tests for per-frame tracing."""
+
+import json
+
+from slmmm.tracing import TRACE_METADATA_KEY, Tracer, trace_id_from
+
+
+class Metadata:
+    def __init__(self, *metadata):
+        self.metadata = metadata
+
+    def invocation_metadata(self):
+        return self.metadata
+
+
+def test_only_traced_frames_are_recorded():
+    assert Tracer(enabled=False).new_trace_id() == 0
+    tracer = Tracer(enabled=True)
+    trace_id = tracer.new_trace_id()
+    assert 0 < trace_id < 2 ** 53
+    with tracer.span("untraced", 0):
+        pass
+    tracer.begin("untraced hop", 0)
+    assert not tracer.events
+
+    with tracer.span("send", trace_id, nbytes=10):
+        pass
+    tracer.begin("hop", trace_id)
+    tracer.end("hop", trace_id)
+    span, begin, end = tracer.events
+    assert span["ph"] == "X" and span["dur"] >= 0
+    assert span["args"] == {"trace_id": trace_id, "nbytes": 10}
+    assert (begin["ph"], end["ph"]) == ("b", "e")
+    assert begin["id"] == end["id"] == hex(trace_id)
+
+
+def test_ring_buffer_keeps_the_newest_events():
+    tracer = Tracer(capacity=3, enabled=True)
+    for i in range(5):
+        with tracer.span(f"span {i}", 1):
+            pass
+    assert [event["name"] for event in tracer.events] == ["span 2", "span 3", "span 4"]
+
+
+def test_chrome_events():
+    tracer = Tracer(enabled=True)
+    with tracer.span("paint", 7):
+        pass
+    events = json.loads(json.dumps(tracer.chrome_events()))
+    assert events[0]["ph"] == "M" and events[0]["name"] == "process_name"
+    assert {"name", "cat", "ph", "ts", "pid", "tid", "args"} <= set(events[1])
+
+
+def test_trace_ids_from_clients_are_checked():
+    assert trace_id_from(Metadata((TRACE_METADATA_KEY, "42"))) == 42
+    assert trace_id_from(Metadata()) == 0
+    for value in ["not a number", "-3", str(2 ** 64), ""]:
+        assert trace_id_from(Metadata((TRACE_METADATA_KEY, value))) == 0